@@ -1,22 +1,62 @@
-import traceback
-from datetime import datetime
-
-from google.adk.agents import LlmAgent
-from google.adk.runners import Runner
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.sessions import InMemorySessionService
-from google.adk.memory import InMemoryMemoryService
-from google.genai.types import Content,Part
-from dotenv import load_dotenv
-load_dotenv()
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from agents.adk.response_cache import ResponseCache
+from server.telemetry import telemetry
+
+# google.adk takes seconds to import, so it's loaded when the first agent is
+# created rather than when this module is: importing it stays cheap for code
+# that only needs the server or the task managers.
+if TYPE_CHECKING:
+    from google.adk.agents import LlmAgent
+    from google.adk.models import BaseLlm
+
+logger = logging.getLogger(__name__)
+
+
+def build(**kwargs) -> "TellTimeAgent":
+    """
+    Loads .env (GOOGLE_API_KEY and friends) and creates the agent; kwargs go to
+    `TellTimeAgent`. Entry points call this instead of relying on import side effects.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return TellTimeAgent(**kwargs)
 
 class TellTimeAgent:
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
     
-    def __init__(self):
+    def __init__(self, max_sessions:int = 1000, session_idle_ttl:float = 1800.0,
+                 response_cache:ResponseCache|None = None, model:"str|BaseLlm" = "gemini-2.0-flash"):
+        # `model` can be any ADK model name or a BaseLlm instance (e.g. a fake one for benchmarks)
+        from google.adk.runners import Runner
+        from google.adk.artifacts import InMemoryArtifactService
+        from google.adk.sessions import InMemorySessionService
+        from google.adk.memory import InMemoryMemoryService
+
+        self._model = model
         self._agent = self._build_agent()
         self._user_id = "time_agent_user"
 
+        # Opt-in: identical prompts within the cache TTL share one model call.
+        # The answer only has second precision, so a TTL of ~1s is plenty here.
+        # Cached answers don't go through the session, so they don't show up in its history.
+        self._response_cache = response_cache
+
+        # Warm-session cache: session_id -> last time it was used (LRU order, oldest first).
+        # Known sessions skip the session service entirely; sessions idle longer than
+        # `session_idle_ttl`, or pushed out past `max_sessions`, are deleted.
+        self._max_sessions = max_sessions
+        self._session_idle_ttl = session_idle_ttl
+        self._sessions:OrderedDict[str,float] = OrderedDict()
+        self._session_lock = asyncio.Lock()
+        self.session_hits = 0
+        self.session_misses = 0
+
         self._runner = Runner(
             app_name=self._agent.name,
             agent=self._agent,
@@ -25,54 +65,75 @@ class TellTimeAgent:
             artifact_service=InMemoryArtifactService()
         )
 
-    def _build_agent(self)->LlmAgent:
+    def _build_agent(self)->"LlmAgent":
+        from google.adk.agents import LlmAgent
+
         return LlmAgent(
             name="TellTimeAgent",
             description="Tells the time, duh",
-            model = "gemini-2.0-flash",
+            model = self._model,
             instruction="Reply with the current time in the format YYYY-MM-DD HH:MM:SS"
         )
     
-    async def invoke(self, query:str, session_id:str)->str:
-        try:
-            session = await self._runner.session_service.create_session(
-                app_name=self._agent.name,
-                user_id = self._user_id,
-                state={},
-                session_id=session_id
-            )
+    @property
+    def session_stats(self)->dict:
+        return {"hits": self.session_hits, "misses": self.session_misses, "live": len(self._sessions)}
+
+    async def _get_or_create_session(self, session_id:str)->str:
+        """
+        Returns the id of a live session, creating it only the first time we see it.
+        """
+        now = time.monotonic()
+        last_used = self._sessions.get(session_id)
+        if last_used is not None and now - last_used <= self._session_idle_ttl:
+            self.session_hits += 1
+            self._sessions[session_id] = now
+            self._sessions.move_to_end(session_id)
+            return session_id
 
-            if session is None:
-                session = await self._runner.session_service.create_session(
-                    app_name=self._agent.name,
-                    user_id=self._user_id,
-                    state={},
-                    session_id=session_id
+        # Slow path is serialized so two first turns of one session can't both create it
+        async with self._session_lock:
+            last_used = self._sessions.get(session_id)
+            if last_used is None or now - last_used > self._session_idle_ttl:
+                self.session_misses += 1
+                session = await self._runner.session_service.get_session(
+                    app_name=self._agent.name, user_id=self._user_id, session_id=session_id
                 )
-            
-            content = Content(
-                role="user",
-                parts=[Part.from_text(text=query)]
+                if session is None:
+                    session = await self._runner.session_service.create_session(
+                        app_name=self._agent.name,
+                        user_id=self._user_id,
+                        state={},
+                        session_id=session_id
+                    )
+                session_id = session.id
+            else:
+                self.session_hits += 1
+            self._sessions[session_id] = now
+            self._sessions.move_to_end(session_id)
+            await self._evict_sessions(now)
+        return session_id
+
+    async def _evict_sessions(self, now:float):
+        while self._sessions:
+            session_id, last_used = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self._max_sessions and now - last_used <= self._session_idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+            await self._runner.session_service.delete_session(
+                app_name=self._agent.name, user_id=self._user_id, session_id=session_id
             )
 
-            last_event = None
-            async for event in self._runner.run_async(
-                user_id = self._user_id,
-                session_id = session.id,
-                new_message = content
-            ):
-                last_event = event
-            
-            if not last_event or not last_event.content or not last_event.content.parts:
-                return ""
-            
-            return "\n".join([p.text for p in last_event.content.parts if p.text])
-        except Exception as e:
-            # Print a user-friendly error message
-            print(f"🔥🔥🔥 An error occurred in TellTimeAgent.invoke: {e}")
-
-            # Print the full, detailed stack trace to the console
-            traceback.print_exc()
+    async def invoke(self, query:str, session_id:str)->str:
+        try:
+            if self._response_cache is not None:
+                return await self._response_cache.get_or_compute(
+                    query, lambda: self._run_turn(query, session_id)
+                )
+            return await self._run_turn(query, session_id)
+        except Exception:
+            # Full stack trace goes to the log, not to the client
+            logger.exception("TellTimeAgent.invoke failed")
 
             # Return a helpful error message to the user/client
             return "Sorry, I encountered an internal error and couldn't process your request."
@@ -81,5 +142,61 @@ class TellTimeAgent:
                 
 
     
+    async def _run_turn(self, query:str, session_id:str)->str:
+        from google.genai.types import Content, Part
+
+        session_id = await self._get_or_create_session(session_id)
+
+        content = Content(
+            role="user",
+            parts=[Part.from_text(text=query)]
+        )
+
+        last_event = None
+        with telemetry.span("llm.turn", agent=self._agent.name):
+            async for event in self._runner.run_async(
+                user_id = self._user_id,
+                session_id = session_id,
+                new_message = content
+            ):
+                last_event = event
+
+        if not last_event or not last_event.content or not last_event.content.parts:
+            return ""
+
+        return "\n".join([p.text for p in last_event.content.parts if p.text])
+
     async def stream(self,query:str, session_id:str):
-        pass
\ No newline at end of file
+        """
+        Runs the agent in SSE streaming mode and yields text as soon as the model produces it.
+
+        Yields:
+            {"is_task_complete": False, "updates": <partial text>} for each partial chunk,
+            then {"is_task_complete": True, "content": <full reply>} once the turn is done.
+        """
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        from google.genai.types import Content, Part
+
+        session_id = await self._get_or_create_session(session_id)
+
+        content = Content(
+            role="user",
+            parts=[Part.from_text(text=query)]
+        )
+
+        with telemetry.span("llm.turn", agent=self._agent.name, streaming=True):
+            async for event in self._runner.run_async(
+                user_id = self._user_id,
+                session_id = session_id,
+                new_message = content,
+                run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+            ):
+                texts = []
+                if event.content and event.content.parts:
+                    texts = [p.text for p in event.content.parts if p.text]
+
+                if event.partial:
+                    if texts:
+                        yield {"is_task_complete": False, "updates": "".join(texts)}
+                elif event.is_final_response():
+                    yield {"is_task_complete": True, "content": "\n".join(texts)}
@@ -0,0 +1,174 @@
+# =============================================================================
+# agents/adk/task_manager.py
+# =============================================================================
+# 🎯 Purpose:
+# Connects the TellTime agent to the A2A task lifecycle.
+#
+# ✅ Includes:
+# - `AgentTaskMixin`: runs the agent for /tasks/send (blocking) and
+#   /tasks/sendSubscribe (streaming), recording every state change on the task
+# - Both run the agent in a separate asyncio task, so /tasks/cancel can stop
+#   the model call midway
+# - `AgentTaskManager`: the mixin over in-memory storage (one process)
+# - `SqliteAgentTaskManager`: the mixin over SQLite, so several worker
+#   processes (`A2AServer.start(workers=N)`) share the same tasks
+# =============================================================================
+
+import asyncio
+import uuid
+from typing import AsyncIterable
+
+from models.request import (
+    SendTaskRequest, SendTaskResponse,
+    SendTaskStreamingRequest, SendTaskStreamingResponse
+)
+from models.task import (
+    Message, TextPart, TaskSendParams,
+    TaskStatus, TaskState, TaskStatusUpdateEvent
+)
+from server.task_manager import InMemoryTaskManager
+from server.sqlite_task_manager import SqliteTaskManager
+from agents.adk.agent import TellTimeAgent
+
+
+class AgentTaskMixin:
+    """
+    🤖 Hands each task's text to `TellTimeAgent`. Mix in before a storage-backed
+    `TaskManager` (anything with `upsert_task()`, `update_task()` and `get_task()`).
+
+    Task flow: submitted ➡️ working ➡️ completed (or canceled), with the
+    agent's reply appended to the history and attached to the final status.
+    Each send is a new turn, so a follow-up on a finished task runs the agent
+    again. A turn canceled before the agent starts is answered as it stands,
+    and the agent is never called.
+    """
+
+    def __init__(self, agent: TellTimeAgent, **kwargs):
+        super().__init__(**kwargs)
+        self.agent = agent
+
+    def _get_user_query(self, params: TaskSendParams) -> str:
+        # The agent only understands text, so join the text parts of the message
+        return "\n".join(part.text for part in params.message.parts)
+
+    # -------------------------------------------------------------------------
+    # 📨 on_send_task: Run the agent and reply when it's done
+    # -------------------------------------------------------------------------
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        params: TaskSendParams = request.params
+        error = self._push_notification_error(params)
+        if error is not None:
+            return SendTaskResponse(id=request.id, error=error)
+        turn = uuid.uuid4().hex  # Tags this send's writes, see `update_task()`
+        await self.upsert_task(params, turn=turn)
+        working = TaskStatus(state=TaskState.WORKING)
+        task = await self.update_task(params.id, status=working, turn=turn)
+        if task.status != working:
+            # A /tasks/cancel got in while we were writing: don't start the agent at all
+            return SendTaskResponse(id=request.id, result=task)
+
+        # No await between the check above and this, so a cancel from here on finds the run
+        run = self._start_run(
+            params.id, self.agent.invoke(self._get_user_query(params), params.session_id), turn=turn,
+        )
+        try:
+            result = await run
+        except asyncio.CancelledError:
+            if not self._was_canceled(params.id):
+                raise
+            # /tasks/cancel stopped it; the task is already marked CANCELED
+            return SendTaskResponse(id=request.id, result=await self.get_task(params.id))
+
+        reply = Message(role="agent", parts=[TextPart(text=result)])
+        task = await self.update_task(
+            params.id,
+            status=TaskStatus(state=TaskState.COMPLETED, message=reply),
+            message=reply,
+            turn=turn,
+        )
+        return SendTaskResponse(id=request.id, result=task)
+
+    # -------------------------------------------------------------------------
+    # 📡 on_send_task_subscribe: Stream the agent's reply as it's generated
+    # -------------------------------------------------------------------------
+    async def on_send_task_subscribe(
+        self, request: SendTaskStreamingRequest
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        params: TaskSendParams = request.params
+        error = self._push_notification_error(params)
+        if error is not None:
+            yield SendTaskStreamingResponse(id=request.id, error=error)
+            return
+        turn = uuid.uuid4().hex
+        await self.upsert_task(params, turn=turn)
+        working = TaskStatus(state=TaskState.WORKING)
+        task = await self.update_task(params.id, status=working, turn=turn)
+        if task.status != working:
+            # Canceled before the agent started: report that and stop
+            yield SendTaskStreamingResponse(
+                id=request.id,
+                result=TaskStatusUpdateEvent(id=params.id, status=task.status, final=True),
+            )
+            return
+
+        # The agent streams into a queue from its own asyncio task; None marks the end
+        updates: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            async for item in self.agent.stream(self._get_user_query(params), params.session_id):
+                updates.put_nowait(item)
+
+        run = self._start_run(params.id, pump(), turn=turn)
+        run.add_done_callback(lambda _: updates.put_nowait(None))
+        try:
+            while (item := await updates.get()) is not None:
+                if item["is_task_complete"]:
+                    reply = Message(role="agent", parts=[TextPart(text=item["content"])])
+                    status = TaskStatus(state=TaskState.COMPLETED, message=reply)
+                    # A task that was canceled meanwhile stays canceled: report what's stored
+                    status = (await self.update_task(params.id, status=status, message=reply, turn=turn)).status
+                    final = True
+                else:
+                    # Partial chunks are streamed to the client but not stored in history
+                    chunk = Message(role="agent", parts=[TextPart(text=item["updates"])])
+                    status = TaskStatus(state=TaskState.WORKING, message=chunk)
+                    final = False
+
+                yield SendTaskStreamingResponse(
+                    id=request.id,
+                    result=TaskStatusUpdateEvent(id=params.id, status=status, final=final),
+                )
+
+            if run.cancelled():
+                self._was_canceled(params.id)
+                task = await self.get_task(params.id)
+                yield SendTaskStreamingResponse(
+                    id=request.id,
+                    result=TaskStatusUpdateEvent(id=params.id, status=task.status, final=True),
+                )
+            else:
+                run.result()  # Re-raises the agent's error, if it had one
+        except Exception:
+            await self.update_task(params.id, status=TaskStatus(state=TaskState.FAILED), turn=turn)
+            raise
+        finally:
+            # The client went away mid-stream: stop the agent too
+            run.cancel()
+
+
+class AgentTaskManager(AgentTaskMixin, InMemoryTaskManager):
+    """🧠 `TellTimeAgent` with tasks kept in memory. Single process only."""
+
+
+class SqliteAgentTaskManager(AgentTaskMixin, SqliteTaskManager):
+    """
+    💾 `TellTimeAgent` with tasks kept in SQLite, shared by every worker process
+    that opens the same file: /tasks/get answers the same whichever worker gets it.
+
+    ❗ Still per process: ADK sessions, push notification registrations, and
+    the run itself. A /tasks/cancel that lands on another worker marks the task
+    CANCELED, and it stays CANCELED, because finished tasks are never rewritten.
+    But nothing stops the owning worker's agent: the model call runs to the end,
+    still costs its tokens and can still call other agents, and then its result
+    is thrown away. Only a cancel that reaches the owning worker stops the work.
+    """
@@ -4,12 +4,11 @@ from uuid import uuid4
 
 class JSONRPCMessage(BaseModel):
     jsonrpc: Literal["2.0"] = "2.0"
-    id: int|str|None = Field(default_factory=lambda: uuid4.hex())
+    id: int|str|None = Field(default_factory=lambda: uuid4().hex)
 
 class JSONRPCRequest(JSONRPCMessage):
-    code: int
-    message: str
-    data: Any|None = None
+    method: str
+    params: Any|None = None
 
 class JSONRPCError(BaseModel):
     code: int
@@ -23,4 +22,34 @@ class JSONRPCResponse(JSONRPCMessage):
 class InternalError(JSONRPCError):
     code: int = -32603
     message:str = "Internal Error"
-    data:Any | None = None
\ No newline at end of file
+    data:Any | None = None
+
+class TaskNotFoundError(JSONRPCError):
+    code: int = -32001
+    message: str = "Task not found"
+    data: Any | None = None
+
+class TaskNotCancelableError(JSONRPCError):
+    code: int = -32002
+    message: str = "Task cannot be canceled"
+    data: Any | None = None
+
+class JSONParseError(JSONRPCError):
+    code: int = -32700
+    message: str = "Invalid JSON payload"
+    data: Any | None = None
+
+class InvalidRequestError(JSONRPCError):
+    code: int = -32600
+    message: str = "Request payload validation error"
+    data: Any | None = None
+
+class PushNotificationNotSupportedError(JSONRPCError):
+    code: int = -32003
+    message: str = "Push Notification is not supported"
+    data: Any | None = None
+
+class InvalidParamsError(JSONRPCError):
+    code: int = -32602
+    message: str = "Invalid parameters"
+    data: Any | None = None
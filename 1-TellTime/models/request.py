@@ -1,7 +1,9 @@
 from typing import Literal, Annotated, Union
 from pydantic import TypeAdapter, Field
 from models.json_rpc import JSONRPCRequest, JSONRPCResponse
-from models.task import Task, TaskSendParams, TaskQueryParams
+from models.task import (
+    Task, TaskSendParams, TaskQueryParams, TaskIdParams, TaskStatusUpdateEvent, TaskPushNotificationConfig
+)
 
 class SendTaskRequest(JSONRPCRequest):
     method:Literal["/tasks/send"] = "/tasks/send"
@@ -11,15 +13,46 @@ class GetTaskRequest(JSONRPCRequest):
     method:Literal["/tasks/get"] = "/tasks/get"
     params:TaskQueryParams
 
+class SendTaskStreamingRequest(JSONRPCRequest):
+    method:Literal["/tasks/sendSubscribe"] = "/tasks/sendSubscribe"
+    params:TaskSendParams
+
+class CancelTaskRequest(JSONRPCRequest):
+    method:Literal["/tasks/cancel"] = "/tasks/cancel"
+    params:TaskIdParams
+
+class SetTaskPushNotificationRequest(JSONRPCRequest):
+    method:Literal["/tasks/pushNotification/set"] = "/tasks/pushNotification/set"
+    params:TaskPushNotificationConfig
+
+class GetTaskPushNotificationRequest(JSONRPCRequest):
+    method:Literal["/tasks/pushNotification/get"] = "/tasks/pushNotification/get"
+    params:TaskIdParams
+
 class SendTaskResponse(JSONRPCResponse):
     result:Task|None = None
 
 class GetTaskResponse(JSONRPCResponse):
     result:Task|None=None
 
+class SendTaskStreamingResponse(JSONRPCResponse):
+    result:TaskStatusUpdateEvent|None = None
+
+class CancelTaskResponse(JSONRPCResponse):
+    result:Task|None = None
+
+class SetTaskPushNotificationResponse(JSONRPCResponse):
+    result:TaskPushNotificationConfig|None = None
+
+class GetTaskPushNotificationResponse(JSONRPCResponse):
+    result:TaskPushNotificationConfig|None = None
+
 A2ARequest = TypeAdapter(
     Annotated[
-        Union[SendTaskRequest, GetTaskRequest],
+        Union[
+            SendTaskRequest, GetTaskRequest, SendTaskStreamingRequest, CancelTaskRequest,
+            SetTaskPushNotificationRequest, GetTaskPushNotificationRequest,
+        ],
         Field(discriminator="method")
     ]
 )
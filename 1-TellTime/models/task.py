@@ -11,17 +11,32 @@ Part = TextPart
 
 class Message(BaseModel):
     role: Literal["user","agent"]
-    parts = List[Part]
+    parts: List[Part]
 
 class TaskStatus(BaseModel):
     state:str
+    message:Message|None = None
     timestamp: datetime.datetime = Field(default_factory=datetime.datetime.now)
 
 class Task(BaseModel):
     id:str
-    status:str
+    status:TaskStatus
     history:List[Message]
 
+class TaskStatusUpdateEvent(BaseModel):
+    id:str
+    status:TaskStatus
+    final:bool = False
+    metadata:dict[str,Any] | None = None
+
+class PushNotificationConfig(BaseModel):
+    url:str
+    token:str | None = None   # Sent back with every update so the receiver can check it
+
+class TaskPushNotificationConfig(BaseModel):
+    id:str
+    push_notification_config:PushNotificationConfig
+
 class TaskIdParams(BaseModel):
     id: str
     metadata: dict[str, Any] | None = None
@@ -31,9 +46,10 @@ class TaskQueryParams(TaskIdParams):
 
 class TaskSendParams(BaseModel):
     id:str
-    session_id:str = Field(default_factory=lambda: uuid4.hex)
+    session_id:str = Field(default_factory=lambda: uuid4().hex)
     message:Message
     history_length:int|None = None
+    push_notification:PushNotificationConfig | None = None
     metadata:dict[str,Any] | None = None
 
 
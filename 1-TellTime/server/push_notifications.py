@@ -0,0 +1,297 @@
+# =============================================================================
+# server/push_notifications.py
+# =============================================================================
+# 🎯 Purpose:
+# Push task status updates to client webhooks, so clients don't have to poll
+# /tasks/get to find out when a task moves on.
+#
+# ✅ Includes:
+# - `PushNotificationDispatcher`: per-task webhook registry plus a bounded
+#   pool of async workers that POST updates in the background
+#
+# 💡 Delivery model:
+# - `notify()` never blocks the request path: it only queues the event
+# - Events for the same webhook (URL + token) are batched into one POST of a
+#   JSON array, and always delivered in order
+# - Failed POSTs (network errors, 429, 5xx) are retried with exponential
+#   backoff and jitter, honouring a numeric Retry-After; other 4xx are dropped
+# - At most `max_pending` events wait at once; beyond that new ones are
+#   dropped and counted, so a dead receiver can't eat the server's memory
+#
+# 🛡️ Webhook URLs come from clients, so the server would POST wherever it's
+# told to: only http(s) URLs are accepted, and a host that is (or resolves
+# to) a loopback, private, link-local (cloud metadata), reserved or multicast
+# address is refused unless it's in `allowed_hosts`. Literal addresses are
+# checked on registration; names are resolved and checked before every POST.
+# =============================================================================
+
+
+# -----------------------------------------------------------------------------
+# 📚 Standard Python Imports
+# -----------------------------------------------------------------------------
+
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+
+# -----------------------------------------------------------------------------
+# 📦 Third-party and Project Imports
+# -----------------------------------------------------------------------------
+
+import httpx
+
+from models.task import PushNotificationConfig, TaskStatusUpdateEvent
+
+logger = logging.getLogger(__name__)
+
+# Header carrying the per-task token, so the receiver can check the POST is really for it
+NOTIFICATION_TOKEN_HEADER = "X-A2A-Notification-Token"
+
+# Where a batch goes: (webhook URL, token)
+_Destination = Tuple[str, Optional[str]]
+
+_Address = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+class UnsafeWebhookError(ValueError):
+    """A webhook URL the dispatcher refuses to POST to."""
+
+
+class PushNotificationDispatcher:
+    """
+    🔔 Delivers `TaskStatusUpdateEvent`s to the webhooks clients registered per task.
+
+    Args:
+        client: httpx client to POST with (pass one with an ASGI/mock transport
+            to test against a local stub receiver); one is created if omitted
+        workers: how many POSTs can be in flight at once
+        max_pending: most undelivered events held in memory
+        batch_size: most events sent in one POST
+        batch_window_ms: how long a worker waits for more events to join a batch
+        max_retries / backoff_base / backoff_max: retry schedule for failed POSTs
+        allowed_hosts: host names (exact match) and networks (e.g. "10.0.0.0/8")
+            webhooks may use even though they aren't public, e.g. a receiver
+            on the same machine or the cluster network
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        workers: int = 4,
+        max_pending: int = 10_000,
+        batch_size: int = 32,
+        batch_window_ms: float = 50.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 5.0,
+        allowed_hosts: Iterable[str] = (),
+    ):
+        self._client = client
+        self._owns_client = client is None
+        self.timeout = timeout
+        self.num_workers = workers
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.allowed_names = set()
+        self.allowed_networks = []
+        for entry in allowed_hosts:
+            try:
+                self.allowed_networks.append(ipaddress.ip_network(entry, strict=False))
+            except ValueError:
+                self.allowed_names.add(entry.lower())
+
+        self._configs: Dict[str, PushNotificationConfig] = {}
+        # Undelivered events per destination; a destination sits in `_ready`
+        # (and is owned by at most one worker) while it has any
+        self._pending: Dict[_Destination, Deque[TaskStatusUpdateEvent]] = {}
+        self._pending_count = 0
+        self._ready: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.stats = {"sent": 0, "batches": 0, "retries": 0, "failed": 0, "dropped": 0}
+
+    # -------------------------------------------------------------------------
+    # 📝 Webhook registry
+    # -------------------------------------------------------------------------
+    def register(self, task_id: str, config: PushNotificationConfig) -> None:
+        """Raises `UnsafeWebhookError` if `config.url` isn't a webhook we may POST to."""
+        self.check_url(config.url)
+        self._configs[task_id] = config
+
+    def get(self, task_id: str) -> Optional[PushNotificationConfig]:
+        return self._configs.get(task_id)
+
+    def unregister(self, task_id: str) -> None:
+        self._configs.pop(task_id, None)
+
+    # -------------------------------------------------------------------------
+    # 🛡️ Destination checks
+    # -------------------------------------------------------------------------
+    def check_url(self, url: str) -> Optional[str]:
+        """
+        Check what can be checked without DNS: the scheme, and the host if it's
+        a literal address or "localhost". Raises `UnsafeWebhookError`; returns
+        the host name if it still has to be resolved and checked, else None.
+        """
+        try:
+            parts = urlsplit(url)
+            parts.port  # Raises on a malformed port
+        except ValueError:
+            raise UnsafeWebhookError(f"invalid webhook URL: {url!r}") from None
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise UnsafeWebhookError(f"webhook URL must be http(s) with a host: {url!r}")
+        host = parts.hostname.lower()
+        if host in self.allowed_names:
+            return None
+        if host == "localhost" or host.endswith(".localhost"):
+            raise UnsafeWebhookError(f"webhook host not allowed: {host}")
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return host
+        self._check_address(host, address)
+        return None
+
+    async def _check_destination(self, url: str) -> None:
+        # Resolved on every attempt, as what a name points at can change
+        host = self.check_url(url)
+        if host is None:
+            return
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        for info in infos:
+            self._check_address(host, ipaddress.ip_address(info[4][0].split("%", 1)[0]))
+
+    def _check_address(self, host: str, address: _Address) -> None:
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if any(address in network for network in self.allowed_networks):
+            return
+        if not address.is_global or address.is_multicast:
+            raise UnsafeWebhookError(f"webhook host {host} is not a public address ({address})")
+
+    # -------------------------------------------------------------------------
+    # 📤 notify: Queue an update (never blocks)
+    # -------------------------------------------------------------------------
+    def notify(self, event: TaskStatusUpdateEvent) -> None:
+        config = self._configs.get(event.id)
+        if config is None:
+            return
+        if event.final:
+            # Nothing comes after a final update, so the registration can go
+            self.unregister(event.id)
+        if self._pending_count >= self.max_pending:
+            self.stats["dropped"] += 1
+            return
+
+        self._ensure_workers()
+        destination = (config.url, config.token)
+        queue = self._pending.get(destination)
+        if queue is None:
+            queue = self._pending[destination] = deque()
+            self._ready.put_nowait(destination)
+        queue.append(event)
+        self._pending_count += 1
+
+    def _ensure_workers(self) -> None:
+        if self._workers and not all(worker.done() for worker in self._workers):
+            return
+        self._ready = asyncio.Queue()
+        # Destinations queued before a restart still need a worker
+        for destination in self._pending:
+            self._ready.put_nowait(destination)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+
+    # -------------------------------------------------------------------------
+    # 🧵 Workers
+    # -------------------------------------------------------------------------
+    async def _worker(self) -> None:
+        while True:
+            destination = await self._ready.get()
+            if destination is None:  # Shutdown sentinel from aclose()
+                return
+            # Let more updates for this webhook pile up so they go out in one POST
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            queue = self._pending[destination]
+            batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+            self._pending_count -= len(batch)
+            try:
+                await self._deliver(destination, batch)
+            except Exception as e:
+                # Never let one bad webhook kill the worker
+                logger.warning("push notification to %s failed: %r", destination[0], e)
+                self.stats["failed"] += len(batch)
+            if queue:
+                self._ready.put_nowait(destination)  # More arrived meanwhile: back in line
+            else:
+                del self._pending[destination]
+
+    async def _deliver(self, destination: _Destination, batch: List[TaskStatusUpdateEvent]) -> None:
+        url, token = destination
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers[NOTIFICATION_TOKEN_HEADER] = token
+        body = b"[" + b",".join(event.model_dump_json(exclude_none=True).encode() for event in batch) + b"]"
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                await self._check_destination(url)
+                response = await self._get_client().post(url, content=body, headers=headers)
+                if response.status_code < 300:
+                    self.stats["sent"] += len(batch)
+                    self.stats["batches"] += 1
+                    return
+                if response.status_code != 429 and response.status_code < 500:
+                    break  # The receiver rejected it; sending it again won't help
+                retry_after = response.headers.get("retry-after")
+            except UnsafeWebhookError as e:
+                logger.warning("refusing push notification: %s", e)
+                break
+            except (httpx.TransportError, OSError):
+                pass  # Includes a failed DNS lookup
+            if attempt == self.max_retries:
+                break
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        self.stats["failed"] += len(batch)
+        logger.warning("giving up on %d push notification(s) to %s", len(batch), url)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        # Full jitter: anywhere up to the capped exponential delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    # -------------------------------------------------------------------------
+    # 🔒 Shutdown
+    # -------------------------------------------------------------------------
+    async def aclose(self) -> None:
+        """Deliver everything already queued (retries included), then stop the workers."""
+        if self._workers:
+            # Batches can be re-queued behind a sentinel, so wait for the backlog first
+            while self._pending and not all(worker.done() for worker in self._workers):
+                await asyncio.sleep(self.batch_window or 0.01)
+            for _ in self._workers:
+                self._ready.put_nowait(None)
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -1,14 +1,29 @@
 from datetime import datetime
 from models.agent import AgentCard
-from agents.adk import task_manager
+from server.task_manager import TaskManager
+from server.telemetry import telemetry
+import asyncio
+import hashlib
 import json
+import logging
+import random
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse, Response
-from models.request import A2ARequest, SendTaskRequest
-from models.json_rpc import JSONRPCResponse, InternalError
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from models.request import (
+    A2ARequest, SendTaskRequest, GetTaskRequest, SendTaskStreamingRequest, CancelTaskRequest,
+    SetTaskPushNotificationRequest, GetTaskPushNotificationRequest
+)
+from models.json_rpc import JSONRPCResponse, InternalError, JSONParseError, InvalidRequestError
 from starlette.requests import Request
-from fastapi.encoders import jsonable_encoder
-from typing import Optional
+from pydantic import ValidationError
+from typing import AsyncIterable, Optional
+
+try:
+    import orjson  # Optional: faster parsing of batch request bodies
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 def json_serializer(obj):
     """
@@ -19,49 +34,279 @@ def json_serializer(obj):
         return obj.isoformat()
     raise TypeError(f"Type {type(obj)} not serializable")
 
+# How long a multi-worker server keeps serving while /readyz says 503, unless told otherwise
+DEFAULT_DRAIN_SECONDS = 5.0
+
 class A2AServer:
-    def __init__(self, agent_card: AgentCard,task_manager: task_manager, host="0.0.0.0", port=5000,) -> None:
+    def __init__(self, agent_card: AgentCard,task_manager: TaskManager, host="0.0.0.0", port=5000,
+                 fast_codec: bool = True, log_sample_rate: float = 0.01, max_batch_size: int = 100,
+                 card_max_age: int = 300, drain_seconds: Optional[float] = None,
+                 graceful_timeout: float = 30.0) -> None:
+        """
+        fast_codec: validate raw request bytes with `validate_json` and write responses
+            with `model_dump_json`, skipping the intermediate dicts. Set False for the
+            old request.json() + jsonable_encoder path.
+        log_sample_rate: share of requests logged at DEBUG level (only when DEBUG is on).
+        max_batch_size: most calls accepted in one JSON-RPC batch array.
+        card_max_age: seconds clients may cache the agent card (Cache-Control max-age).
+        drain_seconds: on SIGTERM, how long /readyz reports 503 while requests are still
+            served, so a load balancer can stop routing here before the server stops.
+            Default: DEFAULT_DRAIN_SECONDS when `start()` runs several workers (that's
+            a deployment behind a load balancer), 0 for a single process, so a dev
+            run stops on Ctrl-C right away. Set it to drain a single process too.
+        graceful_timeout: once stopping, how long in-flight requests get to finish.
+        """
         self.host = host
         self.port = port
+        self.fast_codec = fast_codec
+        self.log_sample_rate = log_sample_rate
+        self.max_batch_size = max_batch_size
+        self.card_max_age = card_max_age
+        self.drain_seconds = drain_seconds
+        self.graceful_timeout = graceful_timeout
+        # Ready once the app has started, until a drain begins (see /readyz)
+        self.ready = False
+        self._card_response: Optional[tuple[bytes, str]] = None
         self.agent_card = agent_card
         self.task_manager = task_manager
-        self.app = Starlette()
+        self.app = Starlette(on_startup=[self._on_startup], on_shutdown=[self._on_shutdown])
         self.app.add_route("/",self._handle_request,methods=["POST"])
         self.app.add_route("/.well-known/agent.json", self._get_agent_card, methods=["GET"])
-        
-    def start(self):
+        # Prometheus scrape endpoint; 404 unless `telemetry.enable()` was called
+        self.app.add_route("/metrics", self._get_metrics, methods=["GET"])
+        # Liveness and readiness probes
+        self.app.add_route("/healthz", self._get_health, methods=["GET"])
+        self.app.add_route("/readyz", self._get_readiness, methods=["GET"])
+
+    @property
+    def agent_card(self) -> AgentCard:
+        return self._agent_card
+
+    @agent_card.setter
+    def agent_card(self, card: AgentCard) -> None:
+        # A new card means new bytes and a new ETag; rebuilt on the next GET
+        self._agent_card = card
+        self._card_response = None
+
+    def start(self, workers: int = 1, reuse_port: Optional[bool] = None):
+        """
+        Serve until SIGTERM/SIGINT, draining first (see `drain_seconds`).
+
+        workers: processes to serve from. With more than one, give the server a
+            task manager the workers share, like `SqliteAgentTaskManager`.
+        reuse_port: per-worker SO_REUSEPORT sockets instead of one shared socket
+            (default: when the OS supports it).
+        """
         if not self.agent_card or not self.task_manager:
             raise ValueError("Required fields not found")
-        import uvicorn
-        uvicorn.run(app=self.app,host=self.host, port=self.port)
+        if self.drain_seconds is None:
+            self.drain_seconds = DEFAULT_DRAIN_SECONDS if workers > 1 else 0.0
+        from server.workers import WorkerSupervisor, serve
+        if workers == 1:
+            serve(self)
+        else:
+            WorkerSupervisor(self, workers, reuse_port=reuse_port).run()
+
+    def drain(self):
+        """Stop reporting ready, so load balancers send new work elsewhere. Requests are still served."""
+        self.ready = False
+
+    async def _on_startup(self):
+        self.ready = True
+
+    async def _on_shutdown(self):
+        self.ready = False
+        # Flush what's still queued (writes, push notifications) before the process goes away
+        await self.task_manager.aclose()
 
     async def _handle_request(self, request:Request)->Response:
         try:
-            body = await request.json()
-            print("Incoming JSON: \n", json.dumps(body))
-            json_rpc = A2ARequest.validate_python(body)
+            body = await request.body()
+            if body.lstrip()[:1] == b"[":
+                # JSON-RPC 2.0 batch: an array of calls answered with one array
+                return await self._handle_batch(body)
 
-            if isinstance(json_rpc, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc)
+            if self.fast_codec:
+                # Bytes straight into pydantic: one parse+validate pass, no dict in between
+                # (so there's a single span for both)
+                with telemetry.span("a2a.validate"):
+                    json_rpc = A2ARequest.validate_json(body)
             else:
-                raise ValueError(f"Unsupported A2A method: {type(json_rpc)}")
-            
+                with telemetry.span("a2a.parse"):
+                    data = json.loads(body)
+                with telemetry.span("a2a.validate"):
+                    json_rpc = A2ARequest.validate_python(data)
+            self._log_request(json_rpc)
+
+            if isinstance(json_rpc, SendTaskStreamingRequest):
+                # Streams status updates as Server-Sent Events while the agent is still working
+                return self._create_sse_response(json_rpc, self.task_manager.on_send_task_subscribe(json_rpc))
+
+            with telemetry.span("a2a.dispatch", **{"rpc.method": json_rpc.method}):
+                result = await self._dispatch(json_rpc)
             return self._create_response(result)
         except Exception as e:
             # Return a JSON-RPC compliant error response if anything fails
-            return JSONResponse(
-                JSONRPCResponse(id=None, error=InternalError(message=str(e))).model_dump(),
+            return self._json_response(
+                JSONRPCResponse(id=None, error=InternalError(message=str(e))),
                 status_code=400
             )
 
+    async def _dispatch(self, json_rpc)->JSONRPCResponse:
+        if isinstance(json_rpc, SendTaskRequest):
+            return await self.task_manager.on_send_task(json_rpc)
+        elif isinstance(json_rpc, GetTaskRequest):
+            return await self.task_manager.on_get_task(json_rpc)
+        elif isinstance(json_rpc, CancelTaskRequest):
+            return await self.task_manager.on_cancel_task(json_rpc)
+        elif isinstance(json_rpc, SetTaskPushNotificationRequest):
+            return await self.task_manager.on_set_task_push_notification(json_rpc)
+        elif isinstance(json_rpc, GetTaskPushNotificationRequest):
+            return await self.task_manager.on_get_task_push_notification(json_rpc)
+        else:
+            raise ValueError(f"Unsupported A2A method: {type(json_rpc)}")
+
+    async def _handle_batch(self, body:bytes)->Response:
+        try:
+            with telemetry.span("a2a.parse"):
+                items = orjson.loads(body) if orjson is not None else json.loads(body)
+        except ValueError as e:
+            return self._json_response(JSONRPCResponse(id=None, error=JSONParseError(data=str(e))), status_code=400)
+
+        if not items:
+            return self._json_response(
+                JSONRPCResponse(id=None, error=InvalidRequestError(message="Empty batch")), status_code=400
+            )
+        if len(items) > self.max_batch_size:
+            return self._json_response(
+                JSONRPCResponse(id=None, error=InvalidRequestError(message=f"Batch larger than {self.max_batch_size} calls")),
+                status_code=400,
+            )
+
+        # Every call runs concurrently and fails on its own; one bad item never sinks the batch
+        results = await asyncio.gather(*(self._dispatch_batch_item(item) for item in items))
+
+        # Notifications run but get no entry in the reply; invalid items always get one
+        responses = [response for notification, response in results if not notification]
+        if not responses:
+            return Response(status_code=204)
+        # Each model encodes itself; we only stitch the array together
+        content = b"[" + b",".join(self._encode_batch_response(r) for r in responses) + b"]"
+        return Response(content=content, media_type="application/json")
+
+    @staticmethod
+    def _encode_batch_response(response:JSONRPCResponse)->bytes:
+        if response.id is None:
+            # exclude_none would drop it, but an error for a call without an id must say "id": null
+            return json.dumps({**response.model_dump(mode="json", exclude_none=True), "id": None}).encode()
+        return response.model_dump_json(exclude_none=True).encode()
+
+    async def _dispatch_batch_item(self, item)->tuple[bool, JSONRPCResponse]:
+        """
+        Runs one batch call. Returns (is_notification, response): only a call that
+        validated as a request and has no "id" is a notification. Anything invalid
+        is answered, with `id: null` when it has none, as JSON-RPC 2.0 requires.
+        """
+        request_id = item.get("id") if isinstance(item, dict) else None
+        try:
+            with telemetry.span("a2a.validate"):
+                json_rpc = A2ARequest.validate_python(item)
+        except ValidationError as e:
+            return False, JSONRPCResponse(id=request_id, error=InvalidRequestError(data=str(e)))
+        self._log_request(json_rpc)
+        notification = "id" not in item
+
+        if isinstance(json_rpc, SendTaskStreamingRequest):
+            return notification, JSONRPCResponse(
+                id=request_id, error=InvalidRequestError(message="Streaming methods can't be batched")
+            )
+        try:
+            with telemetry.span("a2a.dispatch", **{"rpc.method": json_rpc.method}):
+                return notification, await self._dispatch(json_rpc)
+        except Exception as e:
+            return notification, JSONRPCResponse(id=request_id, error=InternalError(message=str(e)))
+
+    def _log_request(self, json_rpc):
+        # Cheap check first so the common case (DEBUG off) costs almost nothing
+        if not logger.isEnabledFor(logging.DEBUG) or random.random() >= self.log_sample_rate:
+            return
+        logger.debug(
+            "a2a request",
+            extra={"rpc_method": json_rpc.method, "rpc_id": json_rpc.id, "task_id": json_rpc.params.id},
+        )
+
 
     async def _get_agent_card(self, request:Request)->Response:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True)) 
-    
+        if self._card_response is None:
+            # Serialized once per card: every GET after this just sends the same bytes
+            body = self.agent_card.model_dump_json(exclude_none=True).encode()
+            self._card_response = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        body, etag = self._card_response
+
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={self.card_max_age}"}
+        if self._etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def _get_health(self, request:Request)->Response:
+        return Response(content=b"ok", media_type="text/plain")
+
+    async def _get_readiness(self, request:Request)->Response:
+        if self.ready:
+            return Response(content=b"ready", media_type="text/plain")
+        return Response(content=b"not ready", media_type="text/plain", status_code=503)
+
+    async def _get_metrics(self, request:Request)->Response:
+        rendered = telemetry.render()
+        if rendered is None:
+            return Response(status_code=404)
+        body, content_type = rendered
+        return Response(content=body, media_type=content_type)
+
+    @staticmethod
+    def _etag_matches(if_none_match:Optional[str], etag:str)->bool:
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            # If-None-Match uses weak comparison, so W/"x" matches "x"
+            if candidate == "*" or candidate.removeprefix("W/") == etag:
+                return True
+        return False
+
 
     def _create_response(self, result):
         if isinstance(result, JSONRPCResponse):
-            # jsonable_encoder automatically handles datetime and UUID
-            return JSONResponse(content=jsonable_encoder(result.model_dump(exclude_none=True)))
+            return self._json_response(result)
         else:
-            raise ValueError("Invalid response type")
\ No newline at end of file
+            raise ValueError("Invalid response type")
+
+    def _json_response(self, result:JSONRPCResponse, status_code:int = 200)->Response:
+        if self.fast_codec:
+            # model_dump_json handles datetime and UUID itself and goes straight to bytes
+            return Response(
+                content=result.model_dump_json(exclude_none=True),
+                status_code=status_code,
+                media_type="application/json",
+            )
+        # jsonable_encoder automatically handles datetime and UUID. fastapi is slow to
+        # import and only this path needs it, so it's loaded on first use.
+        from fastapi.encoders import jsonable_encoder
+        return JSONResponse(content=jsonable_encoder(result.model_dump(exclude_none=True)), status_code=status_code)
+
+    def _create_sse_response(self, json_rpc, stream:AsyncIterable[JSONRPCResponse]):
+        async def event_stream():
+            try:
+                async for item in stream:
+                    # One SSE event per update: "data: <json>\n\n"
+                    yield f"data: {item.model_dump_json(exclude_none=True)}\n\n"
+            except Exception as e:
+                # Headers are already sent, so errors go out as a final event instead of a 400
+                error = JSONRPCResponse(id=json_rpc.id, error=InternalError(message=str(e)))
+                yield f"data: {error.model_dump_json(exclude_none=True)}\n\n"
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
@@ -0,0 +1,338 @@
+# =============================================================================
+# server/sqlite_task_manager.py
+# =============================================================================
+# 🎯 Purpose:
+# A `TaskManager` that keeps tasks in a local SQLite file, so they survive
+# restarts (unlike `InMemoryTaskManager`).
+#
+# ✅ Includes:
+# - WAL journal mode: readers never block the writer and vice versa
+# - Group commit: writes from many concurrent requests are queued and
+#   committed together in one transaction by a single writer
+# - Messages stored one row each, so `history_length` loads only the last N
+#   messages instead of deserializing the whole history
+# - Each send is a turn with its own token: a turn's writes check the token
+#   and that the turn hasn't finished in the same UPDATE that writes, so a
+#   worker can't overwrite a cancel another worker just recorded
+#
+# 💡 Threading model:
+# - sqlite3 is blocking, so all database work runs via `asyncio.to_thread`
+# - One writer connection, used only by the batch writer
+# - One reader connection per worker thread (WAL allows parallel readers)
+# - Connections are opened lazily, so a manager created before `fork()`
+#   is still safe to use in the child process
+# =============================================================================
+
+
+# -----------------------------------------------------------------------------
+# 📚 Standard Python Imports
+# -----------------------------------------------------------------------------
+
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterable, Callable, List, Optional, Tuple
+
+
+# -----------------------------------------------------------------------------
+# 📦 Project Imports
+# -----------------------------------------------------------------------------
+
+from models.request import (
+    SendTaskRequest, SendTaskResponse,
+    GetTaskRequest, GetTaskResponse,
+    SendTaskStreamingRequest, SendTaskStreamingResponse
+)
+from models.task import Task, TaskSendParams, TaskQueryParams, TaskStatus, TaskState, Message
+from models.json_rpc import TaskNotFoundError
+from server.task_manager import TaskManager
+from server.task_store import TERMINAL_STATES
+from server.push_notifications import PushNotificationDispatcher
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          TEXT PRIMARY KEY,         -- Indexed lookups by task id
+    session_id  TEXT,
+    status      TEXT NOT NULL,            -- TaskStatus as JSON
+    next_seq    INTEGER NOT NULL DEFAULT 0,
+    updated_at  REAL NOT NULL,
+    turn        TEXT                      -- Token of the send that owns the task right now
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_session_id ON tasks(session_id);
+
+CREATE TABLE IF NOT EXISTS task_messages (
+    task_id  TEXT NOT NULL,
+    seq      INTEGER NOT NULL,
+    message  TEXT NOT NULL,               -- Message as JSON
+    PRIMARY KEY (task_id, seq)            -- Newest-N queries walk this index backwards
+) WITHOUT ROWID;
+"""
+
+_TERMINAL = tuple(sorted(TERMINAL_STATES))  # Bound into the UPDATE guard in update_task()
+
+# A queued write: a function run on the writer connection, and the future for its result
+_WriteOp = Tuple[Callable[[sqlite3.Connection], Any], asyncio.Future]
+
+
+class SqliteTaskManager(TaskManager):
+    """
+    💾 Stores tasks in a WAL-mode SQLite database.
+
+    Like `InMemoryTaskManager`, `on_send_task` is left to subclasses; this class
+    provides `upsert_task()`, `update_task()` and `get_task()` to build on.
+
+    Call `aclose()` on shutdown to flush pending writes and close connections.
+    """
+
+    def __init__(
+        self,
+        path: str = "tasks.db",
+        batch_size: int = 256,
+        batch_window_ms: float = 1.0,
+        push_notifier: Optional[PushNotificationDispatcher] = None,
+    ):
+        super().__init__()
+        self.path = path
+        self.push_notifier = push_notifier            # Webhook registrations live in memory, not in the file
+        self.batch_size = batch_size                  # Most writes committed in one transaction
+        self.batch_window = batch_window_ms / 1000    # How long the writer waits for more writes to join a batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._writer_conn: Optional[sqlite3.Connection] = None
+        self._readers = threading.local()
+        self._reader_conns: List[sqlite3.Connection] = []
+        self._reader_conns_lock = threading.Lock()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # 🔌 Connections
+    # -------------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: we issue BEGIN/COMMIT ourselves
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")    # Safe with WAL; fsync only at checkpoints
+        conn.execute("PRAGMA busy_timeout=5000")
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                # Files created before turns existed lack the column
+                if "turn" not in {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}:
+                    conn.execute("ALTER TABLE tasks ADD COLUMN turn TEXT")
+                self._schema_ready = True
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._readers.conn = conn
+            with self._reader_conns_lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    # -------------------------------------------------------------------------
+    # ✍️ Group-committed writes
+    # -------------------------------------------------------------------------
+    async def _submit(self, op: Callable[[sqlite3.Connection], Any]) -> Any:
+        if self._writer_task is None or self._writer_task.done():
+            self._queue = asyncio.Queue()
+            self._writer_task = asyncio.create_task(self._writer_loop())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _writer_loop(self) -> None:
+        closing = False
+        while not closing:
+            first = await self._queue.get()
+            if first is None:  # Shutdown sentinel from aclose()
+                break
+            batch: List[_WriteOp] = [first]
+            # Give concurrent requests a moment to join this transaction
+            if self.batch_window and self._queue.empty():
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            try:
+                results = await asyncio.to_thread(self._commit_batch, [op for op, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _commit_batch(self, ops: List[Callable[[sqlite3.Connection], Any]]) -> List[Any]:
+        """Run all ops in one transaction. A failing op is rolled back alone via its savepoint."""
+        if self._writer_conn is None:
+            self._writer_conn = self._connect()
+        conn = self._writer_conn
+        results: List[Any] = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for op in ops:
+                conn.execute("SAVEPOINT op")
+                try:
+                    results.append(op(conn))
+                    conn.execute("RELEASE op")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    results.append(e)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    # -------------------------------------------------------------------------
+    # 💾 upsert_task / update_task
+    # -------------------------------------------------------------------------
+    async def upsert_task(self, params: TaskSendParams, turn: Optional[str] = None) -> Task:
+        """
+        Start a turn: create the task, or append the message to its history, and leave
+        it "submitted" with `turn` as the token for this turn's `update_task()` calls.
+
+        Returns:
+            Task – with the last `params.history_length` messages (all if None)
+        """
+        status_json = TaskStatus(state=TaskState.SUBMITTED).model_dump_json()
+        message_json = params.message.model_dump_json()
+
+        def op(conn: sqlite3.Connection) -> Task:
+            conn.execute(
+                "INSERT INTO tasks (id, session_id, status, next_seq, updated_at, turn) VALUES (?, ?, ?, 0, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET status = excluded.status, turn = excluded.turn",
+                (params.id, params.session_id, status_json, time.time(), turn),
+            )
+            self._append_message(conn, params.id, message_json)
+            return self._load_task(conn, params.id, params.history_length)
+
+        self._register_push_notification(params)
+        return await self._submit(op)
+
+    async def update_task(
+        self,
+        task_id: str,
+        status: Optional[TaskStatus] = None,
+        message: Optional[Message] = None,
+        history_length: Optional[int] = None,
+        turn: Optional[str] = None,
+    ) -> Optional[Task]:
+        """
+        Set a new status and/or append a message. Returns None for unknown tasks.
+
+        A task whose turn already finished (whichever worker finished it), or that
+        has moved on from `turn`, is returned unchanged: check the state you get
+        back to see whether the update applied.
+        """
+        status_json = status.model_dump_json() if status is not None else None
+        message_json = message.model_dump_json() if message is not None else None
+
+        def op(conn: sqlite3.Connection) -> Optional[Task]:
+            # Checked and written in one statement, inside the writer's BEGIN IMMEDIATE,
+            # so no other process can finish the task (or start a new turn) in between
+            cur = conn.execute(
+                "UPDATE tasks SET status = COALESCE(?, status), updated_at = ? "
+                "WHERE id = ? AND json_extract(status, '$.state') NOT IN (?, ?, ?) AND (? IS NULL OR turn = ?)",
+                (status_json, time.time(), task_id, *_TERMINAL, turn, turn),
+            )
+            if cur.rowcount == 0:
+                return self._load_task(conn, task_id, history_length)  # Unknown (None), finished or moved on
+            if message_json is not None:
+                self._append_message(conn, task_id, message_json)
+            return self._load_task(conn, task_id, history_length)
+
+        task = await self._submit(op)
+        if status is not None and task is not None and task.status == status:
+            self._notify_status(task)
+        return task
+
+    def _append_message(self, conn: sqlite3.Connection, task_id: str, message_json: str) -> bool:
+        row = conn.execute(
+            "UPDATE tasks SET next_seq = next_seq + 1, updated_at = ? WHERE id = ? RETURNING next_seq",
+            (time.time(), task_id),
+        ).fetchone()
+        if row is None:
+            return False
+        conn.execute(
+            "INSERT INTO task_messages (task_id, seq, message) VALUES (?, ?, ?)",
+            (task_id, row[0], message_json),
+        )
+        return True
+
+    # -------------------------------------------------------------------------
+    # 📖 Reads
+    # -------------------------------------------------------------------------
+    def _load_task(self, conn: sqlite3.Connection, task_id: str, history_length: Optional[int]) -> Optional[Task]:
+        row = conn.execute("SELECT status FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        limit = -1 if history_length is None else max(history_length, 0)   # -1 = no limit
+        messages = conn.execute(
+            "SELECT message FROM task_messages WHERE task_id = ? ORDER BY seq DESC LIMIT ?",
+            (task_id, limit),
+        ).fetchall()
+        return Task(
+            id=task_id,
+            status=TaskStatus.model_validate_json(row[0]),
+            history=[Message.model_validate_json(m[0]) for m in reversed(messages)],
+        )
+
+    async def get_task(self, task_id: str, history_length: Optional[int] = None) -> Optional[Task]:
+        return await asyncio.to_thread(
+            lambda: self._load_task(self._reader(), task_id, history_length)
+        )
+
+    # -------------------------------------------------------------------------
+    # 🚫 on_send_task: Must be implemented by any subclass
+    # -------------------------------------------------------------------------
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        raise NotImplementedError("on_send_task() must be implemented in subclass")
+
+    def on_send_task_subscribe(
+        self, request: SendTaskStreamingRequest
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        raise NotImplementedError("on_send_task_subscribe() must be implemented in subclass")
+
+    # -------------------------------------------------------------------------
+    # 📥 on_get_task: Fetch a task by its ID
+    # -------------------------------------------------------------------------
+    async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
+        query: TaskQueryParams = request.params
+        task = await self.get_task(query.id, query.history_length)
+        if task is None:
+            return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+        return GetTaskResponse(id=request.id, result=task)
+
+    # -------------------------------------------------------------------------
+    # 🔒 Shutdown
+    # -------------------------------------------------------------------------
+    async def aclose(self) -> None:
+        """Wait for queued writes to commit, then close every connection (and flush push notifications)."""
+        await super().aclose()
+        if self._writer_task is not None:
+            if not self._writer_task.done():
+                await self._queue.put(None)  # Writes queued before this still get committed
+                await self._writer_task
+            self._writer_task = None
+        with self._reader_conns_lock:
+            conns = self._reader_conns + ([self._writer_conn] if self._writer_conn else [])
+            self._reader_conns = []
+        self._writer_conn = None
+        self._readers = threading.local()
+        for conn in conns:
+            conn.close()
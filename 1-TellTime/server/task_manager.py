@@ -7,11 +7,22 @@
 # ✅ Includes:
 # - A base abstract class `TaskManager` that outlines required methods
 # - A simple `InMemoryTaskManager` that keeps tasks temporarily in memory
+#   (backed by the lock-striped `ShardedTaskStore` in server/task_store.py)
+#
+# 🔔 Push notifications: pass a `PushNotificationDispatcher`
+#   (server/push_notifications.py) and every status change is POSTed to the
+#   webhook the client registered for that task
+#
+# 🛑 Cancellation: subclasses run the agent through `_start_run()`, and
+#   /tasks/cancel cancels that asyncio task. The cancel reaches whatever the
+#   agent is awaiting (the model call, HTTP requests to other agents) and the
+#   task ends up CANCELED.
 #
 # ❌ Does not include:
-# - Cancel task functionality
-# - Push notifications or real-time updates
-# - Persistent storage (like a database)
+# - Persistent storage (like a database) – see `SqliteTaskManager` in
+#   server/sqlite_task_manager.py for that
+#
+# 🧹 Memory stays bounded: see `RetentionPolicy` in server/task_store.py
 # =============================================================================
 
 
@@ -19,9 +30,10 @@
 # 📚 Standard Python Imports
 # -----------------------------------------------------------------------------
 
+import asyncio
 from abc import ABC, abstractmethod        # Lets us define abstract base classes (like an interface)
-from typing import Dict                    # Dict is a dictionary type for storing key-value pairs
-import asyncio                             # Used here for locks to safely handle concurrency (async operations)
+from functools import partial
+from typing import AsyncIterable, Awaitable, Dict, Set  # AsyncIterable: what streaming methods hand back
 
 
 # -----------------------------------------------------------------------------
@@ -30,13 +42,24 @@ import asyncio                             # Used here for locks to safely handl
 
 from models.request import (
     SendTaskRequest, SendTaskResponse,    # For sending tasks to the agent
-    GetTaskRequest, GetTaskResponse       # For querying task info from the agent
+    GetTaskRequest, GetTaskResponse,      # For querying task info from the agent
+    SendTaskStreamingRequest, SendTaskStreamingResponse,  # For streaming updates while the agent works
+    CancelTaskRequest, CancelTaskResponse,  # For stopping a task that's still running
+    SetTaskPushNotificationRequest, SetTaskPushNotificationResponse,  # For registering a webhook
+    GetTaskPushNotificationRequest, GetTaskPushNotificationResponse
 )
 
 from models.task import (
     Task, TaskSendParams, TaskQueryParams,  # Task and input models
-    TaskStatus, TaskState, Message          # Task metadata and history objects
+    TaskStatus, Message,                    # Task metadata and history objects
+    TaskState, TaskStatusUpdateEvent, TaskPushNotificationConfig
 )
+from models.json_rpc import (
+    JSONRPCError, InvalidParamsError, TaskNotFoundError, TaskNotCancelableError, PushNotificationNotSupportedError
+)
+
+from server.task_store import ShardedTaskStore, RetentionPolicy, TERMINAL_STATES  # Lock-striped storage with lock-free reads
+from server.push_notifications import PushNotificationDispatcher, UnsafeWebhookError
 
 
 # -----------------------------------------------------------------------------
@@ -47,13 +70,19 @@ class TaskManager(ABC):
     """
     🔧 This is a base interface class.
 
-    All Task Managers must implement these two async methods:
+    All Task Managers must implement these methods:
     - on_send_task(): to receive and process new tasks
     - on_get_task(): to fetch the current status or conversation history of a task
+    - on_send_task_subscribe(): like on_send_task, but streams status updates as they happen
 
     This makes sure all implementations follow a consistent structure.
     """
 
+    def __init__(self):
+        # 🛑 The asyncio task running the agent for each task ID, so /tasks/cancel can stop it
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: Set[str] = set()
+
     @abstractmethod
     async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
         """📥 This method will handle new incoming tasks."""
@@ -64,6 +93,154 @@ class TaskManager(ABC):
         """📤 This method will return task details by task ID."""
         pass
 
+    @abstractmethod
+    def on_send_task_subscribe(
+        self, request: SendTaskStreamingRequest
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """📡 This method will stream task updates (usually written as an async generator)."""
+        pass
+
+    # -------------------------------------------------------------------------
+    # 🔔 Push notifications (shared by every manager that has a dispatcher)
+    # -------------------------------------------------------------------------
+    push_notifier: PushNotificationDispatcher | None = None
+
+    async def get_task(self, task_id: str) -> Task | None:
+        """🔎 Look up a task by ID (None if unknown). Storage-backed managers override this."""
+        raise NotImplementedError("get_task() must be implemented in subclass")
+
+    async def update_task(
+        self, task_id: str, status: TaskStatus | None = None, message: Message | None = None,
+        turn: str | None = None,
+    ) -> Task | None:
+        """
+        🔄 Record a status change and/or a message. Storage-backed managers override this.
+
+        Every send is a turn, started by `upsert_task(params, turn=...)`. Once a turn
+        has finished (a TERMINAL_STATES state), only a new send changes the task again;
+        an update tagged with `turn` also only lands while that turn is the current one.
+        A skipped update returns the task as stored, so callers compare the state they
+        get back.
+        """
+        raise NotImplementedError("update_task() must be implemented in subclass")
+
+    # -------------------------------------------------------------------------
+    # 🛑 Cancellation (shared by every manager that runs its agent via _start_run)
+    # -------------------------------------------------------------------------
+    async def on_cancel_task(self, request: CancelTaskRequest) -> CancelTaskResponse:
+        """
+        🛑 Stop a task that's still running.
+
+        The agent's asyncio task is cancelled and awaited, so by the time this
+        answers the model call and any outgoing requests are gone, and the task
+        is CANCELED. Finished tasks can't be canceled.
+        """
+        task_id = request.params.id
+        task = await self.get_task(task_id)
+        if task is None:
+            return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
+        if task.status.state in TERMINAL_STATES:
+            return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+
+        run = self._running.get(task_id)
+        if run is None:
+            # Nothing is working on it in this process (e.g. not started yet): just close it
+            task = await self.update_task(task_id, status=TaskStatus(state=TaskState.CANCELED))
+            return CancelTaskResponse(id=request.id, result=task)
+
+        self._cancel_requested.add(task_id)
+        if not run.cancel():
+            # It finished a moment ago and its result is being recorded
+            self._cancel_requested.discard(task_id)
+            return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+        await asyncio.wait([run])
+        return CancelTaskResponse(id=request.id, result=await self.get_task(task_id))
+
+    def _start_run(self, task_id: str, work: Awaitable, turn: str | None = None) -> asyncio.Task:
+        """
+        Run `work` (the agent call for a task's `turn`) in its own asyncio task that
+        /tasks/cancel can cancel. However it's cancelled, the turn is marked
+        CANCELED before the run finishes.
+        """
+        run = asyncio.ensure_future(self._cancel_guard(task_id, work, turn))
+        self._running[task_id] = run
+        run.add_done_callback(partial(self._run_done, task_id))
+        return run
+
+    def _was_canceled(self, task_id: str) -> bool:
+        """True if /tasks/cancel stopped this task's run (as opposed to, say, the client going away)."""
+        if task_id in self._cancel_requested:
+            self._cancel_requested.discard(task_id)
+            return True
+        return False
+
+    async def _cancel_guard(self, task_id: str, work: Awaitable, turn: str | None):
+        try:
+            return await work
+        except asyncio.CancelledError:
+            # Tagged, so a stale run can't cancel a newer turn of the same task
+            await self.update_task(task_id, status=TaskStatus(state=TaskState.CANCELED), turn=turn)
+            raise
+
+    def _run_done(self, task_id: str, run: asyncio.Task) -> None:
+        if self._running.get(task_id) is run:
+            del self._running[task_id]
+
+    async def on_set_task_push_notification(
+        self, request: SetTaskPushNotificationRequest
+    ) -> SetTaskPushNotificationResponse:
+        """📝 Register the webhook that gets this task's status updates."""
+        if self.push_notifier is None:
+            return SetTaskPushNotificationResponse(id=request.id, error=PushNotificationNotSupportedError())
+        if await self.get_task(request.params.id) is None:
+            return SetTaskPushNotificationResponse(id=request.id, error=TaskNotFoundError())
+        try:
+            self.push_notifier.register(request.params.id, request.params.push_notification_config)
+        except UnsafeWebhookError as e:
+            return SetTaskPushNotificationResponse(id=request.id, error=InvalidParamsError(message=str(e)))
+        return SetTaskPushNotificationResponse(id=request.id, result=request.params)
+
+    async def on_get_task_push_notification(
+        self, request: GetTaskPushNotificationRequest
+    ) -> GetTaskPushNotificationResponse:
+        """📖 Return the webhook registered for a task."""
+        if self.push_notifier is None:
+            return GetTaskPushNotificationResponse(id=request.id, error=PushNotificationNotSupportedError())
+        config = self.push_notifier.get(request.params.id)
+        if config is None:
+            return GetTaskPushNotificationResponse(id=request.id, error=TaskNotFoundError())
+        return GetTaskPushNotificationResponse(
+            id=request.id,
+            result=TaskPushNotificationConfig(id=request.params.id, push_notification_config=config),
+        )
+
+    async def aclose(self) -> None:
+        """🔒 Release resources on shutdown. Here: deliver the push notifications still queued."""
+        if self.push_notifier is not None:
+            await self.push_notifier.aclose()
+
+    def _push_notification_error(self, params: TaskSendParams) -> JSONRPCError | None:
+        # Check a webhook that came along with the task before the task is stored
+        if self.push_notifier is None or params.push_notification is None:
+            return None
+        try:
+            self.push_notifier.check_url(params.push_notification.url)
+        except UnsafeWebhookError as e:
+            return InvalidParamsError(message=str(e))
+        return None
+
+    def _register_push_notification(self, params: TaskSendParams) -> None:
+        # A webhook can also come along with the task itself
+        if self.push_notifier is not None and params.push_notification is not None:
+            self.push_notifier.register(params.id, params.push_notification)
+
+    def _notify_status(self, task: Task | None) -> None:
+        # Queue only: delivery happens on the dispatcher's workers, off the request path
+        if self.push_notifier is not None and task is not None:
+            self.push_notifier.notify(
+                TaskStatusUpdateEvent(id=task.id, status=task.status, final=task.status.state in TERMINAL_STATES)
+            )
+
 
 # -----------------------------------------------------------------------------
 # 🧠 InMemoryTaskManager
@@ -81,39 +258,64 @@ class InMemoryTaskManager(TaskManager):
     ❗ Not for production: Data is lost when the app stops or restarts.
     """
 
-    def __init__(self):
-        self.tasks: Dict[str, Task] = {}   # 🗃️ Dictionary where key = task ID, value = Task object
-        self.lock = asyncio.Lock()         # 🔐 Async lock to ensure two requests don't modify data at the same time
+    def __init__(
+        self,
+        num_shards: int = 16,
+        retention: RetentionPolicy | None = None,
+        push_notifier: PushNotificationDispatcher | None = None,
+    ):
+        # 🗃️ Tasks live in a sharded store: writes lock only their own shard,
+        # reads don't lock at all and get an immutable snapshot back.
+        # `retention` caps history length, idle time and task count (eviction
+        # counters are in `self.store.stats`).
+        super().__init__()
+        self.store = ShardedTaskStore(num_shards=num_shards, retention=retention)
+        self.push_notifier = push_notifier
 
     # -------------------------------------------------------------------------
     # 💾 upsert_task: Create or update a task in memory
     # -------------------------------------------------------------------------
-    async def upsert_task(self, params: TaskSendParams) -> Task:
+    async def upsert_task(self, params: TaskSendParams, turn: str | None = None) -> Task:
         """
         Create a new task if it doesn’t exist, or update the history if it does.
+        Either way a new turn starts: the task is "submitted" again.
 
         Args:
             params: TaskSendParams – includes task ID, session ID, and message
+            turn: token for this turn; pass it to `update_task()` for the turn's writes
 
         Returns:
             Task – the newly created or updated task
         """
-        async with self.lock:
-            task = self.tasks.get(params.id)  # Try to find an existing task with this ID
-
-            if task is None:
-                # If task doesn't exist, create it with a "submitted" status
-                task = Task(
-                    id=params.id,
-                    status=TaskStatus(state=TaskState.SUBMITTED),
-                    history=[params.message]
-                )
-                self.tasks[params.id] = task
-            else:
-                # If task exists, add the new message to its history
-                task.history.append(params.message)
-
-            return task
+        self._register_push_notification(params)
+        return await self.store.upsert(params, turn=turn)
+
+    # -------------------------------------------------------------------------
+    # 🔄 update_task: Change a task's status and/or add a message
+    # -------------------------------------------------------------------------
+    async def update_task(
+        self,
+        task_id: str,
+        status: TaskStatus | None = None,
+        message: Message | None = None,
+        turn: str | None = None,
+    ) -> Task | None:
+        """
+        Record a state transition or a new message (e.g. the agent's reply).
+        A finished turn (completed, canceled, failed) is left as it is, and so is
+        a task that has moved on from `turn`.
+
+        Returns:
+            Task – the task as stored now (unchanged if the update was skipped),
+            or None if the ID is unknown
+        """
+        task = await self.store.update(task_id, status=status, message=message, turn=turn)
+        if status is not None and task is not None and task.status == status:
+            self._notify_status(task)
+        return task
+
+    async def get_task(self, task_id: str) -> Task | None:
+        return self.store.get(task_id)
 
     # -------------------------------------------------------------------------
     # 🚫 on_send_task: Must be implemented by any subclass
@@ -128,6 +330,12 @@ class InMemoryTaskManager(TaskManager):
         """
         raise NotImplementedError("on_send_task() must be implemented in subclass")
 
+    def on_send_task_subscribe(
+        self, request: SendTaskStreamingRequest
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Same as on_send_task: streaming is up to the subclass."""
+        raise NotImplementedError("on_send_task_subscribe() must be implemented in subclass")
+
     # -------------------------------------------------------------------------
     # 📥 on_get_task: Fetch a task by its ID
     # -------------------------------------------------------------------------
@@ -141,19 +349,17 @@ class InMemoryTaskManager(TaskManager):
         Returns:
             GetTaskResponse – contains the task if found, or an error message
         """
-        async with self.lock:
-            query: TaskQueryParams = request.params
-            task = self.tasks.get(query.id)
-
-            if not task:
-                # If task not found, return a structured error
-                return GetTaskResponse(id=request.id, error={"message": "Task not found"})
-
-            # Optional: Trim the history to only show the last N messages
-            task_copy = task.model_copy()  # Make a copy so we don't affect the original
-            if query.historyLength is not None:
-                task_copy.history = task_copy.history[-query.historyLength:]  # Get last N messages
-            else:
-                task_copy.history = task_copy.history
-
-            return GetTaskResponse(id=request.id, result=task_copy)
\ No newline at end of file
+        query: TaskQueryParams = request.params
+        task = self.store.get(query.id)  # Lock-free: stored tasks are never modified in place
+
+        if not task:
+            # If task not found, return a structured error
+            return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+
+        # Optional: Trim the history to only show the last N messages.
+        # Only then do we build a (shallow) copy; otherwise the snapshot is returned as-is.
+        if query.history_length is not None:
+            recent = task.history[-query.history_length:] if query.history_length > 0 else []
+            task = task.model_copy(update={"history": recent})
+
+        return GetTaskResponse(id=request.id, result=task)
@@ -0,0 +1,254 @@
+# =============================================================================
+# server/task_store.py
+# =============================================================================
+# 🎯 Purpose:
+# A concurrency-friendly in-memory home for tasks, used by `InMemoryTaskManager`.
+#
+# ✅ Includes:
+# - `ShardedTaskStore`: tasks spread over N shards, each with its own lock
+# - Lock-free reads that hand out immutable task snapshots
+# - `RetentionPolicy`: bounded history, idle TTL and an LRU cap on task count,
+#   all on by default (100 messages, 1 h idle, ~10k tasks)
+# - `EvictionStats`: counters so you can see what retention is throwing away
+#
+# 💡 How it works:
+# - Writers only lock the shard their task id hashes to, so updates to
+#   unrelated tasks don't wait on each other.
+# - A write never edits a published Task. It records the change and drops
+#   the cached snapshot. The next read builds a fresh Task, so readers can
+#   grab snapshots without a lock and never see a half-written task.
+# - Each shard is an LRU (OrderedDict, oldest first). Going over the cap
+#   evicts from the front, and idle tasks are swept from the front too.
+# - Only finished tasks (completed, canceled, failed) are ever evicted: a
+#   task that's still running must be there when its result comes in.
+# - Each /tasks/send is a turn: `upsert()` starts it (back to "submitted",
+#   even on a finished task) under a token the caller picks. `update()` with
+#   that token only lands while it's still the current turn and unfinished,
+#   so a result arriving after a cancel can't turn CANCELED back into COMPLETED.
+# - ❗ Evicted tasks are gone: /tasks/get answers "task not found" for them.
+# - With telemetry on, time spent waiting for a shard lock is recorded as
+#   a2a_lock_wait_seconds{lock="task_store"}
+# =============================================================================
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, asdict
+from itertools import islice
+from typing import Deque, List, Optional
+
+from pydantic import BaseModel, Field
+
+from models.task import Task, TaskSendParams, TaskStatus, TaskState, Message
+from server.telemetry import telemetry
+
+# States after which a task never changes again
+TERMINAL_STATES = {TaskState.COMPLETED, TaskState.CANCELED, TaskState.FAILED}
+
+
+class RetentionPolicy(BaseModel):
+    """
+    📏 How much the store is allowed to remember. `None` switches a limit off.
+
+    `max_tasks` is approximate: each shard holds at most max_tasks / num_shards,
+    so a busy shard can start evicting before the store as a whole is full.
+    Tasks that haven't finished are never evicted, so they can push a shard
+    over its share.
+    """
+    max_history_length: Optional[int] = Field(default=100, ge=1)      # Messages kept per task (oldest dropped first)
+    idle_ttl_seconds: Optional[float] = Field(default=3600.0, gt=0)   # Tasks untouched this long are evicted
+    max_tasks: Optional[int] = Field(default=10_000, ge=1)            # Approximate cap, enforced per shard with LRU eviction
+
+
+@dataclass
+class EvictionStats:
+    """📊 Running totals of what retention has removed."""
+    lru_evictions: int = 0       # Tasks dropped because the store was full
+    ttl_evictions: int = 0       # Tasks dropped because they sat idle too long
+    history_trimmed: int = 0     # Messages pushed out of a full history ring buffer
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _TaskRecord:
+    """Mutable bookkeeping for one task. Only the store touches it, under the shard lock."""
+
+    __slots__ = ("id", "status", "turn", "history", "touched_at", "_snapshot")
+
+    def __init__(self, task_id: str, status: TaskStatus, max_history: Optional[int]):
+        self.id = task_id
+        self.status = status
+        self.turn: Optional[str] = None  # Token of the send that owns the task right now
+        self.history: Deque[Message] = deque(maxlen=max_history)  # Ring buffer
+        self.touched_at = time.monotonic()
+        self._snapshot: Optional[Task] = None
+
+    def snapshot(self) -> Task:
+        # Built lazily and cached until the next write, so repeated reads are free
+        if self._snapshot is None:
+            self._snapshot = Task(id=self.id, status=self.status, history=list(self.history))
+        return self._snapshot
+
+    def changed(self) -> None:
+        self._snapshot = None
+        self.touched_at = time.monotonic()
+
+
+class ShardedTaskStore:
+    """
+    🗄️ Stores tasks in `num_shards` LRU dictionaries with one asyncio lock per shard.
+
+    ❗ Tasks returned by `get()` are shared snapshots: treat them as read-only.
+    To change a task, go through `upsert()` or `update()`.
+    """
+
+    def __init__(self, num_shards: int = 16, retention: Optional[RetentionPolicy] = None):
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self.num_shards = num_shards
+        self.retention = retention or RetentionPolicy()
+        self.stats = EvictionStats()
+        self._shards: List["OrderedDict[str, _TaskRecord]"] = [OrderedDict() for _ in range(num_shards)]
+        self._locks: List[asyncio.Lock] = [asyncio.Lock() for _ in range(num_shards)]
+        # The global cap is split evenly so each shard can enforce it on its own
+        self._shard_cap = (
+            math.ceil(self.retention.max_tasks / num_shards) if self.retention.max_tasks else None
+        )
+
+    def _index(self, task_id: str) -> int:
+        return hash(task_id) % self.num_shards
+
+    def _expired(self, record: _TaskRecord, now: float) -> bool:
+        ttl = self.retention.idle_ttl_seconds
+        return ttl is not None and now - record.touched_at > ttl
+
+    @staticmethod
+    def _evictable(record: _TaskRecord) -> bool:
+        # A running task has an agent that will still write its result
+        return record.status.state in TERMINAL_STATES
+
+    # -------------------------------------------------------------------------
+    # 📖 Reads (no locking)
+    # -------------------------------------------------------------------------
+    def get(self, task_id: str) -> Optional[Task]:
+        """Return the current snapshot of a task, or None if we don't know it (or it expired)."""
+        shard = self._shards[self._index(task_id)]
+        record = shard.get(task_id)
+        if record is None:
+            return None
+        now = time.monotonic()
+        if self._expired(record, now) and self._evictable(record):
+            del shard[task_id]
+            self.stats.ttl_evictions += 1
+            return None
+        record.touched_at = now
+        shard.move_to_end(task_id)  # Mark as most recently used
+        return record.snapshot()
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._shards[self._index(task_id)]
+
+    # -------------------------------------------------------------------------
+    # ✍️ Writes (one shard lock each)
+    # -------------------------------------------------------------------------
+    async def upsert(self, params: TaskSendParams, turn: Optional[str] = None) -> Task:
+        """
+        Start a turn: create the task, or append the new message to its history, and
+        leave it "submitted" with `turn` as the token for this turn's updates.
+        """
+        index = self._index(params.id)
+        async with telemetry.timed_lock(self._locks[index], "task_store"):
+            shard = self._shards[index]
+            self._sweep_shard(shard)
+            record = shard.get(params.id)
+            if record is None:
+                record = _TaskRecord(
+                    params.id,
+                    TaskStatus(state=TaskState.SUBMITTED),
+                    self.retention.max_history_length,
+                )
+                shard[params.id] = record
+                self._enforce_cap(shard)
+            else:
+                shard.move_to_end(params.id)
+                record.status = TaskStatus(state=TaskState.SUBMITTED)  # A follow-up starts a new turn
+            record.turn = turn
+            self._append(record, params.message)
+            record.changed()
+            return record.snapshot()
+
+    async def update(
+        self,
+        task_id: str,
+        status: Optional[TaskStatus] = None,
+        message: Optional[Message] = None,
+        turn: Optional[str] = None,
+    ) -> Optional[Task]:
+        """
+        Swap in a new status and/or append a message. Returns None for unknown tasks.
+
+        A task that already finished its turn, or (given `turn`) has moved on to
+        another one, is returned unchanged: check the state you get back to see
+        whether your update was applied.
+        """
+        index = self._index(task_id)
+        async with telemetry.timed_lock(self._locks[index], "task_store"):
+            shard = self._shards[index]
+            self._sweep_shard(shard)
+            record = shard.get(task_id)
+            if record is None:
+                return None
+            shard.move_to_end(task_id)
+            if record.status.state in TERMINAL_STATES or (turn is not None and turn != record.turn):
+                return record.snapshot()
+            if status is not None:
+                record.status = status
+            if message is not None:
+                self._append(record, message)
+            record.changed()
+            return record.snapshot()
+
+    # -------------------------------------------------------------------------
+    # 🧹 Retention
+    # -------------------------------------------------------------------------
+    def sweep(self) -> int:
+        """Evict every idle task right now. Returns how many were removed."""
+        return sum(self._sweep_shard(shard) for shard in self._shards)
+
+    def _append(self, record: _TaskRecord, message: Message) -> None:
+        if record.history.maxlen is not None and len(record.history) == record.history.maxlen:
+            self.stats.history_trimmed += 1
+        record.history.append(message)
+
+    def _sweep_shard(self, shard: "OrderedDict[str, _TaskRecord]") -> int:
+        # Oldest entries sit at the front, so stop at the first one not yet idle
+        if self.retention.idle_ttl_seconds is None:
+            return 0
+        now = time.monotonic()
+        expired = []
+        for task_id, record in shard.items():
+            if not self._expired(record, now):
+                break
+            if self._evictable(record):
+                expired.append(task_id)
+        for task_id in expired:
+            del shard[task_id]
+        self.stats.ttl_evictions += len(expired)
+        return len(expired)
+
+    def _enforce_cap(self, shard: "OrderedDict[str, _TaskRecord]") -> None:
+        if self._shard_cap is None:
+            return
+        excess = len(shard) - self._shard_cap
+        if excess <= 0:
+            return
+        # Least recently used finished tasks go first; running ones are skipped
+        victims = list(islice((task_id for task_id, record in shard.items() if self._evictable(record)), excess))
+        for task_id in victims:
+            del shard[task_id]
+        self.stats.lru_evictions += len(victims)
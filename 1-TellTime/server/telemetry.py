@@ -0,0 +1,162 @@
+# =============================================================================
+# server/telemetry.py
+# =============================================================================
+# 🎯 Purpose:
+# Optional timing for the hot paths: request parsing and dispatch, task store
+# lock waits and LLM turns, as OpenTelemetry spans and Prometheus histograms.
+#
+# ✅ Includes:
+# - `Telemetry`: the switch plus the metrics it records
+# - `telemetry`: the process-wide instance every module records into
+#
+# 💡 How to use it:
+# - Call `telemetry.enable()` before serving. `A2AServer` then answers
+#   GET /metrics in the Prometheus text format (needs `prometheus_client`);
+#   `enable(metrics_port=...)` also serves them on a port of their own
+# - Spans go through the OpenTelemetry API (`opentelemetry-api`, optional), so
+#   they're only exported once an OpenTelemetry SDK tracer provider is
+#   installed; without one they're no-ops
+# - Both optional packages are imported by `enable()`, not here, so a server
+#   that never turns telemetry on doesn't pay to load them
+# - Disabled (the default), `span()` hands back one shared no-op context
+#   manager and `timed_lock()` the lock itself: a flag check, nothing more
+# =============================================================================
+
+import contextlib
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import TracerProvider
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets in seconds. Spans range from sub-millisecond parsing to
+# multi-second LLM turns; lock waits are usually microseconds.
+SPAN_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LOCK_WAIT_BUCKETS = (0.000001, 0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+
+_NOOP = contextlib.nullcontext()
+
+
+class _TimedLock:
+    """Wraps an asyncio lock so `async with` records how long it waited to get in."""
+
+    __slots__ = ("_lock", "_telemetry", "_name")
+
+    def __init__(self, lock, telemetry: "Telemetry", name: str):
+        self._lock = lock
+        self._telemetry = telemetry
+        self._name = name
+
+    async def __aenter__(self):
+        started = time.perf_counter()
+        await self._lock.acquire()
+        self._telemetry._observe(self._telemetry._lock_wait_seconds, (self._name,), time.perf_counter() - started)
+
+    async def __aexit__(self, *exc_info):
+        self._lock.release()
+
+
+class Telemetry:
+    """
+    📈 Spans and histograms for the request path, off until `enable()` is called.
+
+    Metrics:
+    - a2a_span_duration_seconds{span}: time spent in each `span()` block
+    - a2a_lock_wait_seconds{lock}: time spent waiting for a `timed_lock()`
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._tracer = None  # Set by enable(); stays None without opentelemetry
+        self._registry = None
+        self._span_seconds = None
+        self._lock_wait_seconds = None
+        # Label lookups are cached: .labels() takes a lock and builds a key every call
+        self._children: Dict[Tuple[int, Tuple[str, ...]], object] = {}
+
+    def enable(self, tracer_provider: Optional["TracerProvider"] = None, metrics_port: Optional[int] = None) -> None:
+        """
+        Start recording. `tracer_provider` defaults to the global OpenTelemetry one;
+        with `metrics_port`, the metrics are also served on that port.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            logger.warning("opentelemetry-api is not installed: recording metrics only, no spans")
+        else:
+            self._tracer = trace.get_tracer(__name__, tracer_provider=tracer_provider)
+        try:
+            import prometheus_client  # Optional: without it only spans are recorded
+        except ImportError:
+            logger.warning("prometheus_client is not installed: recording spans only, /metrics is off")
+        else:
+            if self._registry is None:
+                self._registry = prometheus_client.CollectorRegistry()
+                self._span_seconds = prometheus_client.Histogram(
+                    "a2a_span_duration_seconds", "Time spent in each instrumented block",
+                    ["span"], registry=self._registry, buckets=SPAN_BUCKETS,
+                )
+                self._lock_wait_seconds = prometheus_client.Histogram(
+                    "a2a_lock_wait_seconds", "Time spent waiting to acquire a lock",
+                    ["lock"], registry=self._registry, buckets=LOCK_WAIT_BUCKETS,
+                )
+            if metrics_port is not None:
+                prometheus_client.start_http_server(metrics_port, registry=self._registry)
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    # -------------------------------------------------------------------------
+    # ⏱️ Recording
+    # -------------------------------------------------------------------------
+    def span(self, name: str, **attributes):
+        """`with telemetry.span("a2a.dispatch", method=...)`: a span plus a histogram sample."""
+        if not self.enabled:
+            return _NOOP
+        return self._timed_span(name, attributes)
+
+    @contextlib.contextmanager
+    def _timed_span(self, name: str, attributes: dict):
+        started = time.perf_counter()
+        try:
+            if self._tracer is None:
+                yield
+            else:
+                # start_as_current_span records exceptions on the span and marks it as an error
+                with self._tracer.start_as_current_span(name, attributes=attributes or None):
+                    yield
+        finally:
+            self._observe(self._span_seconds, (name,), time.perf_counter() - started)
+
+    def timed_lock(self, lock, name: str):
+        """`async with telemetry.timed_lock(lock, "task_store")`: the lock, plus its wait time."""
+        if not self.enabled:
+            return lock
+        return _TimedLock(lock, self, name)
+
+    def _observe(self, histogram, labels: Tuple[str, ...], seconds: float) -> None:
+        if histogram is None:
+            return
+        key = (id(histogram), labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = histogram.labels(*labels)
+        child.observe(seconds)
+
+    # -------------------------------------------------------------------------
+    # 📤 Exposition
+    # -------------------------------------------------------------------------
+    def render(self) -> Optional[Tuple[bytes, str]]:
+        """The metrics in Prometheus text format as (body, content type), or None when off."""
+        if not self.enabled or self._registry is None:
+            return None
+        import prometheus_client  # Already loaded: the registry exists
+
+        return prometheus_client.generate_latest(self._registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+telemetry = Telemetry()
@@ -0,0 +1,224 @@
+# =============================================================================
+# server/workers.py
+# =============================================================================
+# 🎯 Purpose:
+# Serve one `A2AServer` from several processes, so it can use every core.
+#
+# ✅ Includes:
+# - `WorkerSupervisor`: forks N uvicorn workers, restarts any that die and
+#   shuts them all down gracefully on SIGTERM/SIGINT
+# - `DrainingServer`: a uvicorn server that drains before it stops
+#
+# 💡 How it works:
+# - With SO_REUSEPORT (Linux, BSD) every worker binds its own socket to the
+#   same port and the kernel spreads connections across them. Elsewhere the
+#   supervisor binds one socket and the workers share it (gunicorn-style).
+# - Workers are forked after the app is built, so they start with the same
+#   agent and task manager objects. Anything in memory (tasks, sessions) is
+#   then per worker: use `SqliteAgentTaskManager` so they share tasks.
+# - 🚰 Draining: on the first SIGTERM/SIGINT a worker's /readyz turns 503,
+#   it keeps serving for `drain_seconds` so the load balancer can notice, then
+#   stops accepting and waits up to `graceful_timeout` for in-flight requests.
+#   A second signal skips the wait.
+# - Workers ignore SIGINT: Ctrl-C in a terminal reaches the whole process
+#   group, and only the supervisor should act on it. It sends the workers
+#   SIGTERM, once to start the drain and again on a second Ctrl-C.
+# =============================================================================
+
+
+# -----------------------------------------------------------------------------
+# 📚 Standard Python Imports
+# -----------------------------------------------------------------------------
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from multiprocessing.connection import wait
+from typing import TYPE_CHECKING, List, Optional
+
+
+# -----------------------------------------------------------------------------
+# 📦 Third-party Imports
+# -----------------------------------------------------------------------------
+
+import uvicorn
+
+if TYPE_CHECKING:
+    from server.server import A2AServer
+
+logger = logging.getLogger(__name__)
+
+# Workers that die sooner than this after starting are restarted with a pause,
+# so a worker that crashes on startup doesn't turn into a fork loop
+_MIN_WORKER_LIFETIME = 1.0
+
+
+def bind_socket(host: str, port: int, reuse_port: bool = False, backlog: int = 2048) -> socket.socket:
+    """Open a listening TCP socket; `reuse_port` lets other processes bind the same port."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+# -----------------------------------------------------------------------------
+# 🚰 DrainingServer
+# -----------------------------------------------------------------------------
+
+class DrainingServer(uvicorn.Server):
+    """
+    A uvicorn server that, when told to exit, first marks the `A2AServer` as
+    draining and only starts uvicorn's graceful shutdown `drain_seconds` later.
+    With `ignore_sigint` (supervised workers) SIGINT does nothing at all.
+    """
+
+    def __init__(self, config: uvicorn.Config, a2a_server: "A2AServer", ignore_sigint: bool = False):
+        super().__init__(config)
+        self.a2a_server = a2a_server
+        self.ignore_sigint = ignore_sigint
+        self._draining = False
+
+    def handle_exit(self, sig: int, frame) -> None:
+        if sig == signal.SIGINT and self.ignore_sigint:
+            return
+        if self._draining or not self.a2a_server.drain_seconds:
+            super().handle_exit(sig, frame)
+            return
+        self._draining = True
+        self.a2a_server.drain()
+        logger.info("draining for %.1fs before shutting down", self.a2a_server.drain_seconds)
+        # Runs in a signal handler, so don't block: uvicorn polls should_exit on its own
+        timer = threading.Timer(self.a2a_server.drain_seconds, super().handle_exit, (sig, frame))
+        timer.daemon = True
+        timer.start()
+
+
+def serve(
+    a2a_server: "A2AServer", sockets: Optional[List[socket.socket]] = None, ignore_sigint: bool = False,
+) -> None:
+    """Run one uvicorn server for `a2a_server` in this process, with draining."""
+    config = uvicorn.Config(
+        app=a2a_server.app,
+        host=a2a_server.host,
+        port=a2a_server.port,
+        timeout_graceful_shutdown=a2a_server.graceful_timeout,
+    )
+    DrainingServer(config, a2a_server, ignore_sigint=ignore_sigint).run(sockets=sockets)
+
+
+# -----------------------------------------------------------------------------
+# 👷 WorkerSupervisor
+# -----------------------------------------------------------------------------
+
+class WorkerSupervisor:
+    """
+    👷 Keeps `workers` processes serving `a2a_server` until it's told to stop.
+
+    Args:
+        reuse_port: one SO_REUSEPORT socket per worker (default: when the OS has it),
+            or False for a single socket shared by all workers
+    """
+
+    def __init__(self, a2a_server: "A2AServer", workers: int, reuse_port: Optional[bool] = None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.a2a_server = a2a_server
+        self.workers = workers
+        self.reuse_port = hasattr(socket, "SO_REUSEPORT") if reuse_port is None else reuse_port
+        self._context = multiprocessing.get_context("fork")
+        self._socket: Optional[socket.socket] = None
+        self._processes: List[multiprocessing.Process] = []
+        self._started_at: List[float] = []
+        self._stopping = False
+
+    def run(self) -> None:
+        """Start the workers and supervise them. Returns once they've all shut down."""
+        if not self.reuse_port:
+            self._socket = bind_socket(self.a2a_server.host, self.a2a_server.port)
+        previous = {sig: signal.signal(sig, self._handle_signal) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            for _ in range(self.workers):
+                self._processes.append(self._spawn())
+                self._started_at.append(time.monotonic())
+            logger.info(
+                "serving on %s:%s with %d workers (%s)", self.a2a_server.host, self.a2a_server.port,
+                self.workers, "SO_REUSEPORT" if self.reuse_port else "shared socket",
+            )
+            self._supervise()
+        finally:
+            self._stop_workers()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            if self._socket is not None:
+                self._socket.close()
+
+    def _spawn(self) -> multiprocessing.Process:
+        process = self._context.Process(target=self._run_worker, daemon=False)
+        process.start()
+        return process
+
+    def _run_worker(self) -> None:
+        # Forked children inherit the supervisor's handlers. SIGTERM is left to uvicorn's
+        # handler; SIGINT (Ctrl-C hits the whole process group) is ignored, before uvicorn
+        # starts and by DrainingServer after, so only the supervisor's SIGTERM drains
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        if self._socket is not None:
+            sock = self._socket
+        else:
+            sock = bind_socket(self.a2a_server.host, self.a2a_server.port, reuse_port=True)
+        serve(self.a2a_server, sockets=[sock], ignore_sigint=True)
+
+    def _supervise(self) -> None:
+        while not self._stopping:
+            # Wakes up as soon as any worker exits (or to re-check _stopping)
+            wait([process.sentinel for process in self._processes], timeout=1.0)
+            if self._stopping:
+                break
+            for i, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                logger.warning("worker %d exited with code %s; restarting it", process.pid, process.exitcode)
+                if time.monotonic() - self._started_at[i] < _MIN_WORKER_LIFETIME:
+                    time.sleep(_MIN_WORKER_LIFETIME)
+                self._processes[i] = self._spawn()
+                self._started_at[i] = time.monotonic()
+
+    def _handle_signal(self, sig: int, frame) -> None:
+        if self._stopping:
+            # Second signal: another SIGTERM makes the workers skip the rest of the drain
+            # (as SIGTERM, since they ignore SIGINT)
+            self._signal_workers(signal.SIGTERM)
+            return
+        self._stopping = True
+        self._signal_workers(signal.SIGTERM)
+
+    def _signal_workers(self, sig: int) -> None:
+        for process in self._processes:
+            if process.is_alive():
+                try:
+                    os.kill(process.pid, sig)
+                except ProcessLookupError:
+                    pass
+
+    def _stop_workers(self) -> None:
+        if not self._stopping:
+            # Leaving for another reason than a signal (e.g. an error): start the drain now
+            self._stopping = True
+            self._signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + self.a2a_server.drain_seconds + self.a2a_server.graceful_timeout + 5
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("worker %d didn't stop in time; killing it", process.pid)
+                process.kill()
+                process.join()
@@ -0,0 +1,6 @@
+# TellTime's modules import each other from the example's root (`from models...`,
+# `from server...`), as they do when the example runs, so put that root on the path
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,123 @@
+"""
+Webhook URLs come from clients, so the dispatcher must not POST to the
+server's own network (loopback, private ranges, cloud metadata) unless told to.
+"""
+
+import asyncio
+import socket
+
+import httpx
+import pytest
+
+from agents.adk.task_manager import AgentTaskManager
+from models.json_rpc import InvalidParamsError
+from models.request import SendTaskRequest, SetTaskPushNotificationRequest
+from models.task import PushNotificationConfig, TaskState, TaskStatus, TaskStatusUpdateEvent
+from server.push_notifications import PushNotificationDispatcher, UnsafeWebhookError
+
+
+class EchoAgent:
+    async def invoke(self, query: str, session_id: str) -> str:
+        return query
+
+
+def _receiver():
+    """A mock transport that records every POST it gets."""
+    received = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(204)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handle)), received
+
+
+def _event(task_id: str = "t") -> TaskStatusUpdateEvent:
+    return TaskStatusUpdateEvent(id=task_id, status=TaskStatus(state=TaskState.COMPLETED), final=True)
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://example.com/hook",
+    "file:///etc/passwd",
+    "http:///no-host",
+    "http://localhost:8080/hook",
+    "http://127.0.0.1/hook",
+    "http://10.1.2.3/hook",
+    "http://192.168.0.10/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://0.0.0.0/hook",
+    "http://224.0.0.1/hook",
+])
+def test_unsafe_urls_are_refused_on_registration(url):
+    dispatcher = PushNotificationDispatcher()
+    with pytest.raises(UnsafeWebhookError):
+        dispatcher.register("t", PushNotificationConfig(url=url))
+    assert dispatcher.get("t") is None
+
+
+def test_public_urls_and_allowed_hosts_are_accepted():
+    dispatcher = PushNotificationDispatcher(allowed_hosts=["localhost", "10.0.0.0/8"])
+    for url in ("https://example.com/hook", "http://8.8.8.8/hook", "http://localhost:9000/hook", "http://10.1.2.3/hook"):
+        dispatcher.register("t", PushNotificationConfig(url=url))
+        assert dispatcher.get("t").url == url
+    with pytest.raises(UnsafeWebhookError):
+        dispatcher.register("t", PushNotificationConfig(url="http://192.168.0.10/hook"))
+
+
+def test_name_resolving_to_a_private_address_gets_no_post():
+    client, received = _receiver()
+    dispatcher = PushNotificationDispatcher(client=client, batch_window_ms=0)
+
+    async def scenario():
+        async def resolve(host, port, **kwargs):
+            # Passes the check on registration, then points at the metadata service
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("169.254.169.254", 0))]
+
+        asyncio.get_running_loop().getaddrinfo = resolve
+        dispatcher.register("t", PushNotificationConfig(url="http://hooks.example.com/hook"))
+        dispatcher.notify(_event())
+        await dispatcher.aclose()
+
+    asyncio.run(scenario())
+    assert received == []
+    assert dispatcher.stats["failed"] == 1 and dispatcher.stats["retries"] == 0
+
+
+def test_allowed_host_is_delivered_to():
+    client, received = _receiver()
+    dispatcher = PushNotificationDispatcher(client=client, batch_window_ms=0, allowed_hosts=["receiver"])
+
+    async def scenario():
+        dispatcher.register("t", PushNotificationConfig(url="http://receiver/hook", token="secret"))
+        dispatcher.notify(_event())
+        await dispatcher.aclose()
+
+    asyncio.run(scenario())
+    assert len(received) == 1
+    assert received[0].headers["X-A2A-Notification-Token"] == "secret"
+    assert dispatcher.stats["sent"] == 1
+
+
+def test_task_manager_answers_unsafe_webhooks_with_invalid_params():
+    manager = AgentTaskManager(EchoAgent(), push_notifier=PushNotificationDispatcher())
+    message = {"role": "user", "parts": [{"type": "text", "text": "hi"}]}
+    metadata_url = {"url": "http://169.254.169.254/latest/meta-data/"}
+
+    async def scenario():
+        send = await manager.on_send_task(SendTaskRequest.model_validate({
+            "id": 1, "params": {"id": "t", "message": message, "push_notification": metadata_url},
+        }))
+        stored = await manager.get_task("t")
+        await manager.on_send_task(SendTaskRequest.model_validate({"id": 2, "params": {"id": "t", "message": message}}))
+        set_hook = await manager.on_set_task_push_notification(SetTaskPushNotificationRequest.model_validate({
+            "id": 3, "params": {"id": "t", "push_notification_config": metadata_url},
+        }))
+        return send, stored, set_hook
+
+    send, stored, set_hook = asyncio.run(scenario())
+    assert send.error.code == InvalidParamsError().code and send.result is None
+    assert stored is None
+    assert set_hook.error.code == InvalidParamsError().code
+    assert manager.push_notifier.get("t") is None
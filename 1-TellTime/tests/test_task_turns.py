@@ -0,0 +1,144 @@
+"""
+Turns on one task id: a follow-up send runs the agent again, while a cancel is
+never overwritten by the result of the run it canceled. Checked against both the
+in-memory and the SQLite task managers.
+"""
+
+import asyncio
+
+import pytest
+
+from agents.adk.task_manager import AgentTaskManager, SqliteAgentTaskManager
+from models.request import CancelTaskRequest, SendTaskRequest, SendTaskStreamingRequest
+from models.task import TaskState, TaskStatus
+
+
+class FakeAgent:
+    """Answers "T<n>" for its n-th call after `delay` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def invoke(self, query: str, session_id: str) -> str:
+        self.calls += 1
+        reply = f"T{self.calls}"
+        await asyncio.sleep(self.delay)
+        return reply
+
+    async def stream(self, query: str, session_id: str):
+        yield {"is_task_complete": True, "content": await self.invoke(query, session_id)}
+
+
+def _send(task_id: str, text: str, request_type=SendTaskRequest):
+    return request_type.model_validate({
+        "id": 1,
+        "params": {
+            "id": task_id, "session_id": "s",
+            "message": {"role": "user", "parts": [{"type": "text", "text": text}]},
+        },
+    })
+
+
+def _cancel(task_id: str) -> CancelTaskRequest:
+    return CancelTaskRequest.model_validate({"id": 2, "params": {"id": task_id}})
+
+
+def _texts(task) -> list:
+    return [message.parts[0].text for message in task.history]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_manager(request, tmp_path):
+    managers = []
+
+    def make(agent):
+        if request.param == "memory":
+            manager = AgentTaskManager(agent)
+        else:
+            manager = SqliteAgentTaskManager(agent, path=str(tmp_path / "tasks.db"))
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        if isinstance(manager, SqliteAgentTaskManager):
+            asyncio.run(manager.aclose())
+
+
+def test_follow_up_send_on_completed_task_runs_a_new_turn(make_manager):
+    manager = make_manager(FakeAgent())
+
+    async def scenario():
+        first = (await manager.on_send_task(_send("t", "hi"))).result
+        second = (await manager.on_send_task(_send("t", "again"))).result
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.status.state == TaskState.COMPLETED
+    assert second.status.state == TaskState.COMPLETED
+    assert second.status.message.parts[0].text == "T2"
+    assert _texts(second) == ["hi", "T1", "again", "T2"]
+
+
+def test_follow_up_streamed_send_on_completed_task_runs_a_new_turn(make_manager):
+    manager = make_manager(FakeAgent())
+
+    async def scenario():
+        await manager.on_send_task(_send("t", "hi"))
+        events = [e.result async for e in manager.on_send_task_subscribe(_send("t", "again", SendTaskStreamingRequest))]
+        return events, await manager.get_task("t")
+
+    events, task = asyncio.run(scenario())
+    assert events[-1].final and events[-1].status.state == TaskState.COMPLETED
+    assert _texts(task) == ["hi", "T1", "again", "T2"]
+
+
+def test_follow_up_send_on_canceled_task_runs_a_new_turn(make_manager):
+    manager = make_manager(FakeAgent(delay=0.2))
+
+    async def scenario():
+        send = asyncio.create_task(manager.on_send_task(_send("t", "hi")))
+        await asyncio.sleep(0.05)
+        await manager.on_cancel_task(_cancel("t"))
+        canceled = (await send).result
+        manager.agent.delay = 0
+        return canceled, (await manager.on_send_task(_send("t", "again"))).result
+
+    canceled, again = asyncio.run(scenario())
+    assert canceled.status.state == TaskState.CANCELED
+    assert again.status.state == TaskState.COMPLETED
+    assert _texts(again)[-2:] == ["again", "T2"]
+
+
+def test_cancel_before_the_run_starts_is_not_overwritten(make_manager):
+    agent = FakeAgent()
+    manager = make_manager(agent)
+    update_task = manager.update_task
+
+    async def cancel_during_working_write(task_id, status=None, message=None, **kwargs):
+        # The cancel lands between upsert and _start_run, when no run is registered yet
+        if status is not None and status.state == TaskState.WORKING:
+            await manager.on_cancel_task(_cancel(task_id))
+        return await update_task(task_id, status=status, message=message, **kwargs)
+
+    manager.update_task = cancel_during_working_write
+    result = asyncio.run(manager.on_send_task(_send("t", "hi"))).result
+    assert result.status.state == TaskState.CANCELED
+    assert agent.calls == 0
+
+
+def test_late_write_from_an_old_turn_is_refused(make_manager):
+    manager = make_manager(FakeAgent())
+
+    async def scenario():
+        await manager.upsert_task(_send("t", "hi").params, turn="old")
+        await manager.update_task("t", status=TaskStatus(state=TaskState.CANCELED))
+        stale = await manager.update_task("t", status=TaskStatus(state=TaskState.COMPLETED), turn="old")
+        await manager.upsert_task(_send("t", "again").params, turn="new")
+        superseded = await manager.update_task("t", status=TaskStatus(state=TaskState.COMPLETED), turn="old")
+        return stale, superseded
+
+    stale, superseded = asyncio.run(scenario())
+    assert stale.status.state == TaskState.CANCELED
+    assert superseded.status.state == TaskState.SUBMITTED
@@ -2,7 +2,9 @@ from pydantic import BaseModel
 from a2a.server.agent_execution import AgentExecutor # The base class for execution logic
 from a2a.server.agent_execution.context import RequestContext # Holds info about the request
 from a2a.server.events import EventQueue # The mechanism to send messages back to the client
+from a2a.server.tasks import TaskUpdater # Publishes task status changes (like "canceled") on the queue
 from a2a.utils import new_agent_text_message # A handy helper to quickly format a text response
+from response_cache import ResponseCache # Optional cache so repeated prompts skip the agent entirely
 
 class GreetingAgent(BaseModel):
     """Greeting agent that returns a greeting"""
@@ -17,19 +19,25 @@ class GreetingAgentExecutor(AgentExecutor):
     The Executor wraps the actual agent, making it A2A compliant.
     It defines the standard execute and cancel methods for the server to use.
     """
-    def __init__(self) -> None:
+    def __init__(self, response_cache: ResponseCache | None = None) -> None:
         # We hold an instance of our simple agent
         self.agent = GreetingAgent()
+        # Opt-in: same (normalized) prompt within the TTL -> same answer, no agent call
+        self.response_cache = response_cache
 
     # The main function the A2A server calls when a client sends a message
     async def execute(self, context:RequestContext, event_queue:EventQueue):
-        # 1. Call the underlying agent's logic to get the result
-        result = await self.agent.invoke()
+        # 1. Call the underlying agent's logic to get the result (or reuse a cached one)
+        if self.response_cache is not None:
+            result = await self.response_cache.get_or_compute(context.get_user_input(), self.agent.invoke)
+        else:
+            result = await self.agent.invoke()
         
         # 2. Format the result into a standardized A2A message and put it on the queue.
         # This queue handles sending the message back to the client!
         await event_queue.enqueue_event(new_agent_text_message(result))
     
-    # Required for the Executor interface, but we keep it simple for this example
+    # Called for tasks/cancel. The request handler cancels the asyncio task running
+    # `execute` (and the agent call inside it) itself; we just publish the final "canceled" status
     async def cancel(self,context: RequestContext, event_queue: EventQueue):
-        raise Exception("didnt implement cancel for this one") 
\ No newline at end of file
+        await TaskUpdater(event_queue, context.task_id, context.context_id).cancel()
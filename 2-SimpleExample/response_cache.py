@@ -0,0 +1,93 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ResponseCache:
+    """
+    Opt-in cache for agents whose answer depends only on the prompt.
+
+    - Prompts are normalized (case, whitespace, trailing punctuation) so
+      "What time is it?" and "what time is it" share one entry.
+    - Entries live for `ttl` seconds; keep it short for answers that go stale
+      (like the current time) and long for static ones.
+    - Single-flight: concurrent calls for the same prompt share one in-flight
+      computation instead of each running the model.
+    - Failures are never cached.
+    """
+
+    def __init__(self, ttl:float, max_entries:int = 1024) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries:OrderedDict[str, tuple[float, str]] = OrderedDict()  # key -> (expires_at, response)
+        self._inflight:dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def normalize(prompt:str) -> str:
+        return _WHITESPACE.sub(" ", prompt).strip().rstrip("?!.").strip().lower()
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    async def get_or_compute(self, prompt:str, compute:Callable[[], Awaitable[str]]) -> str:
+        key = self.normalize(prompt)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                # shield: a follower being cancelled mustn't cancel the shared call
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # We were cancelled ourselves
+                # The caller doing the work was cancelled; try again on our own
+                return await self.get_or_compute(prompt, compute)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved so an unwatched failure doesn't log a warning
+            raise
+        else:
+            future.set_result(response)
+            self._store(key, response)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key:str, response:str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
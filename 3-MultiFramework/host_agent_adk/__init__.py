@@ -1 +1,8 @@
-from .agent import root_agent
\ No newline at end of file
+# `root_agent` (what ADK's agent loader looks for) is built on first access, so
+# importing the package doesn't load google.adk or contact the friend agents.
+def __getattr__(name):
+    if name == "root_agent":
+        from .agent import root_agent
+        globals()["root_agent"] = root_agent
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
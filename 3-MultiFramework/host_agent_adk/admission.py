@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+
+# JSON-RPC "server error" range (-32000..-32099): the host is at capacity, retry later
+SERVER_BUSY_ERROR_CODE = -32000
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request can't get a slot before its queue deadline (or the queue is full)."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.code = SERVER_BUSY_ERROR_CODE
+        self.message = message
+
+    def to_jsonrpc_error(self) -> dict:
+        return {"code": self.code, "message": self.message}
+
+
+class AdmissionController:
+    """
+    Bounds how many LLM turns the host runs at once.
+
+    - At most `max_concurrency` requests run; the rest wait in a priority
+      queue (higher `priority` first, FIFO within a priority).
+    - A request that can't start within `queue_timeout` seconds, or arrives
+      when `max_queue` requests are already waiting, is rejected right away
+      with `AdmissionRejected` instead of piling onto an overloaded backend.
+    - Requests for the same session run one at a time, in arrival order, so
+      two messages in one conversation never race on the session state.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 64, queue_timeout: float = 10.0) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []  # heap of (-priority, seq, future)
+        self._queued = 0
+        self._seq = itertools.count()
+        self._session_locks: dict[str, list] = {}  # session_id -> [lock, users]
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+    @asynccontextmanager
+    async def admit(self, session_id: str | None = None, priority: int = 0):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected("Host agent is busy, please retry later.")
+
+        session_lock = self._checkout_session_lock(session_id)
+        try:
+            if session_lock is not None:
+                await self._wait_session(session_lock, deadline - loop.time())
+            try:
+                await self._acquire_slot(priority, deadline - loop.time())
+                try:
+                    self.admitted += 1
+                    yield
+                finally:
+                    self._release_slot()
+            finally:
+                if session_lock is not None:
+                    session_lock.release()
+        finally:
+            self._return_session_lock(session_id)
+
+    async def _wait_session(self, lock: asyncio.Lock, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(lock.acquire(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AdmissionRejected("Another message in this session is still being processed.") from None
+
+    async def _acquire_slot(self, priority: int, timeout: float) -> None:
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._seq), future))
+        self._queued += 1
+        try:
+            await asyncio.wait_for(future, timeout=max(timeout, 0))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed to us just as we gave up: pass it on
+                self._release_slot()
+            future.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            raise AdmissionRejected("Host agent is busy, please retry later.") from None
+        finally:
+            self._queued -= 1
+
+    def _release_slot(self) -> None:
+        # Hand the slot straight to the best live waiter; skip ones that gave up
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def _checkout_session_lock(self, session_id: str | None) -> asyncio.Lock | None:
+        if session_id is None:
+            return None
+        entry = self._session_locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        return entry[0]
+
+    def _return_session_lock(self, session_id: str | None) -> None:
+        if session_id is None:
+            return
+        entry = self._session_locks[session_id]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._session_locks[session_id]
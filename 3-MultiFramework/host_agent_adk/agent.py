@@ -1,26 +1,68 @@
 import asyncio
+import contextvars
+import logging
 import uuid
 from google.adk.agents import Agent
+from google.adk.models import BaseLlm
 from google.adk.runners import Runner
 from google.adk.artifacts import InMemoryArtifactService
 from google.adk.memory import InMemoryMemoryService
 from google.adk.sessions import InMemorySessionService
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.tools.tool_context import ToolContext
-from a2a.types import AgentCard, SendMessageRequest, MessageSendParams, SendMessageResponse, SendMessageSuccessResponse, Task
+from a2a.types import (
+    AgentCard, Message, SendMessageRequest, SendStreamingMessageRequest, MessageSendParams, SendMessageResponse,
+    SendMessageSuccessResponse, TaskArtifactUpdateEvent, TaskStatusUpdateEvent,
+)
 from google.genai.types import Content, Part 
-from a2a.client.card_resolver import A2ACardResolver
-from .remote_agent_connection import RemoteAgentConnection
-from .tools import book_court, list_court_availabilities
+from .admission import AdmissionController, AdmissionRejected
+from .artifacts import compact_part, task_parts
+from .card_cache import AgentCardCache
+from .remote_agent_connection import RemoteAgentConnection, TaskCallbackArg
+from .resilience import CircuitOpenError, ResiliencePolicy
+from .telemetry import telemetry
+from .tools import book_court, book_courts, find_common_times, list_court_availabilities
+from .transport import aclose_transport, get_transport
 import datetime
 import json
-import httpx
+
+logger = logging.getLogger(__name__)
+
+# Friends `build()` connects to when none are given: uno's, dos's and tres's agents
+DEFAULT_FRIEND_URLS = [
+    "http://localhost:10002",
+    "http://localhost:10003",
+    "http://localhost:10004",
+]
+
+# Deadline for a single friend agent inside `send_message_to_many`. Friends that
+# haven't answered by then are reported as timed out instead of stalling the round.
+PER_AGENT_TIMEOUT_SECONDS = 20.0
+
+# Queue of friend progress lines for the host turn running in this context (see `stream`)
+_friend_updates:contextvars.ContextVar[asyncio.Queue|None] = contextvars.ContextVar("friend_updates", default=None)
 
 class HostAgent:
-    def __init__(self) -> None:
-        self.remote_agent_connections: dict[str,RemoteAgentConnection]
+    def __init__(
+        self, admission_controller:AdmissionController|None = None, model:str|BaseLlm = "gemini-2.5-flash-lite",
+        remote_agent_addresses:list[str]|None = None, resilience_policy:ResiliencePolicy|None = None,
+    ) -> None:
+        self.remote_agent_connections: dict[str,RemoteAgentConnection] = {}
         self.cards:dict[str,AgentCard] = {}
         self.agents:str = ""
+        # Cards for these are resolved on the first turn, unless `create()` already did
+        self._remote_agent_addresses:list[str] = list(remote_agent_addresses or [])
+        self._cards_resolved = False
+        self._cards_lock = asyncio.Lock()
+        self._card_cache = AgentCardCache(lambda: get_transport().get_client())
+        self._card_refresh_task:asyncio.Task|None = None
+        # Caps concurrent LLM turns and serializes messages within a session
+        self._admission = admission_controller or AdmissionController()
+        # Timeouts, retries and circuit breaking for every friend connection
+        self._resilience_policy = resilience_policy or ResiliencePolicy()
+        # The asyncio task running each session's current turn, so `cancel()` can stop it
+        self._turns:dict[str,asyncio.Task] = {}
+        self._model = model
         self._agent = self.create_agent()   
         self._user_id = "host_agent"
         self._runner = Runner( 
@@ -32,7 +74,7 @@ class HostAgent:
         )
 
     @classmethod
-    async def create(cls, remote_agent_addresses:list[str]):
+    async def create(cls, remote_agent_addresses:list[str], card_refresh_interval:float|None=None, **kwargs):
         """
         yes chatgpt generated this
 
@@ -52,68 +94,152 @@ class HostAgent:
         Args:
             remote_agent_addresses (List[str]): A list of remote agent
                 addresses or endpoints to initialize connections with.
+            card_refresh_interval (float | None): If set, re-resolves the
+                agent cards every this many seconds in the background so
+                friends can come and go without restarting the host.
+            **kwargs: passed to the constructor (e.g. `model`, `resilience_policy`).
 
         Returns:
             instance (cls): A fully initialized instance of the class,
             ready for use after asynchronous setup.
         """
-        instance = cls()
+        instance = cls(**kwargs)
         await instance._async_init_components(remote_agent_addresses)
+        if card_refresh_interval:
+            instance.start_card_refresh(card_refresh_interval)
         return instance
 
     async def _async_init_components(self, remote_agent_addresses:list[str]):
-        async with httpx.AsyncClient(timeout=10) as httpx_client:
-            for address in remote_agent_addresses:
-                card_resolver = A2ACardResolver(
-                    httpx_client=httpx_client,
-                    base_url=address
+        self._remote_agent_addresses = list(remote_agent_addresses)
+        await self.refresh_cards()
+        self._cards_resolved = self._found_friends()
+
+    async def _ensure_cards(self):
+        # An agent from `build()` meets its friends here, on the first turn's event loop.
+        # Until a card resolves, every turn tries again, so friends that start after the
+        # host (or were down for a moment) are still found
+        if self._cards_resolved:
+            return
+        async with self._cards_lock:
+            if not self._cards_resolved:
+                await self.refresh_cards()
+                self._cards_resolved = self._found_friends()
+
+    def _found_friends(self)->bool:
+        return bool(self.cards) or not self._remote_agent_addresses
+
+    async def refresh_cards(self):
+        """
+        Resolves every friend's card concurrently and syncs the connections with them.
+
+        Cards come from a TTL cache revalidated with ETags, so a refresh where nothing
+        changed is mostly 304s. New friends are added, friends whose card changed get
+        a fresh connection, and friends that no longer resolve are dropped.
+        """
+        results = await self._card_cache.resolve_all(self._remote_agent_addresses)
+        httpx_client = get_transport().get_client()
+        resolved:dict[str,tuple[str,AgentCard]] = {}
+        for address, card in results.items():
+            if isinstance(card, Exception):
+                logger.error("failed to get agent card from %s: %r", address, card)
+                continue
+            resolved[card.name] = (address, card)
+
+        for name in list(self.cards):
+            if name not in resolved:
+                logger.warning("dropping agent %s: its card could not be resolved", name)
+                self.cards.pop(name)
+                self.remote_agent_connections.pop(name, None)
+
+        for name, (address, card) in resolved.items():
+            if self.cards.get(name) == card and name in self.remote_agent_connections:
+                continue
+            try:
+                self.remote_agent_connections[name] = RemoteAgentConnection(
+                    agent_card = card,
+                    agent_url = address,
+                    httpx_client = httpx_client,
+                    task_callback = self._forward_friend_update,
+                    policy = self._resilience_policy,
                 )
-                try:
-                    card = await card_resolver.get_agent_card()
-                    connection  = RemoteAgentConnection(
-                        agent_card = card,
-                        agent_url = address
-                    )
-                    self.remote_agent_connections[card.name] =  connection
-                    self.cards[card.name] = card
-                except httpx.ConnectError as e:
-                    print(f"ERROR: Failed to get agent card from {address}: {e}")
-                except Exception as e:
-                    print(f"ERROR: Failed to initialize connection for {address}: {e}")
+                self.cards[name] = card
+            except Exception as e:
+                logger.error("failed to initialize connection for %s: %s", address, e)
+
+        self._update_agent_list()
+        logger.debug("agent_info: %s", self.agents)
 
+    def _update_agent_list(self):
+        # Friends whose circuit is open are left out so the LLM stops trying them;
+        # they come back once the breaker lets a probe through again
         agent_info = [
-            json.dumps({"name": card.name, "description": card.description}) for card in self.cards.values()
+            json.dumps({"name": card.name, "description": card.description})
+            for name, card in self.cards.items()
+            if name not in self.remote_agent_connections or self.remote_agent_connections[name].health.is_available
         ]
-        print("agent_info:", agent_info)
         self.agents = "\n".join(agent_info) if agent_info else "No friends found"
 
+    def start_card_refresh(self, interval:float):
+        """Starts a background task that calls `refresh_cards()` every `interval` seconds."""
+        if self._card_refresh_task is not None and not self._card_refresh_task.done():
+            return
+
+        async def _loop():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.refresh_cards()
+                except Exception as e:
+                    logger.error("agent card refresh failed: %s", e)
+
+        self._card_refresh_task = asyncio.create_task(_loop())
+
+    async def aclose(self):
+        """Stops the card refresh and releases the pooled HTTP connections shared by all friend agents."""
+        if self._card_refresh_task is not None:
+            self._card_refresh_task.cancel()
+            try:
+                await self._card_refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._card_refresh_task = None
+        self.remote_agent_connections.clear()
+        await aclose_transport()
+
     def create_agent(self)->Agent:
         return Agent(
             name="host_agent",
-            model="gemini-2.5-flash-lite",
+            model=self._model,
             description="This Host agent orchestrates scheduling pickleball with friends",
             instruction=self.get_instruction,
             tools=[
                 self.send_message,
+                self.send_message_to_many,
                 list_court_availabilities,
+                find_common_times,
                 book_court,
+                book_courts,
             ]
         )
 
-    def get_instruction(self, context:ReadonlyContext)->str:
+    async def get_instruction(self, context:ReadonlyContext)->str:
+        await self._ensure_cards()
+        self._update_agent_list()
         return f"""
         **Role:** You are the Host Agent, an expert scheduler for pickleball games. Your primary function is to coordinate with friend agents to find a suitable time to play and then book a court.
 
         **Core Directives:**
 
         *   **Initiate Planning:** When asked to schedule a game, first determine who to invite and the desired date range from the user.
-        *   **Task Delegation:** Use the `send_message` tool to ask each friend for their availability.
+        *   **Task Delegation:** Use the `send_message_to_many` tool to ask all invited friends for their availability in a single call.
             *   Frame your request clearly (e.g., "Are you available for pickleball between 2024-08-01 and 2024-08-03?").
-            *   Make sure you pass in the official name of the friend agent for each message request.
-        *   **Analyze Responses:** Once you have availability from all friends, analyze the responses to find common timeslots.
-        *   **Check Court Availability:** Before proposing times to the user, use the `list_court_availabilities` tool to ensure the court is also free at the common timeslots.
+            *   Make sure you pass in the official names of the friend agents.
+            *   Use `send_message` only for a follow-up to one specific friend.
+            *   Friends that report an error or timeout did not answer; tell the user instead of guessing their availability.
+        *   **Analyze Responses:** Once you have availability from all friends, pass every free time range they reported to the `find_common_times` tool. It checks the court schedule too and returns the best times, with who can and can't make each one. Don't work out common timeslots yourself.
+        *   **Check Court Availability:** Use the `list_court_availabilities` tool when the user asks about the court schedule for a specific day.
         *   **Propose and Confirm:** Present the common, court-available timeslots to the user for confirmation.
-        *   **Book the Court:** After the user confirms a time, use the `book_pickleball_court` tool to make the reservation. This tool requires a `start_time` and an `end_time`.
+        *   **Book the Court:** After the user confirms a time, use the `book_court` tool to make the reservation. This tool requires a `start_time` and an `end_time`. To book several time ranges at once, use `book_courts`; it books all of them or none.
         *   **Transparent Communication:** Relay the final booking confirmation, including the booking ID, to the user. Do not ask for permission before contacting friend agents.
         *   **Tool Reliance:** Strictly rely on available tools to address user requests. Do not generate responses based on assumptions.
         *   **Readability:** Make sure to respond in a concise and easy to read format (bullet points are good).
@@ -127,52 +253,175 @@ class HostAgent:
         </Available Agents>
         """
 
-    async def stream(self, query:str, session_id:str):
-        session = await self._runner.session_service.get_session(
-            app_name=self._agent.name, user_id=self._user_id, session_id=session_id
-        )
-        content = Content(role="user",parts=[Part.from_text(text=query)])
-        if session is None:
-            session = await self._runner.session_service.create_session(
-                app_name=self._agent.name,
-                user_id=self._user_id,
-                state={},
-                session_id=session_id,
-            )
-        
-        async for event in self._runner.run_async(
-            user_id=self._user_id, session_id = session_id, new_message=content
-        ):
-            if event.is_final_response():
-                # Yield the final response content when processing is complete, otherwise stream a "thinking" status update.
-                response = ""
-                if (
-                    event.content
-                    and event.content.parts
-                    and event.content.parts[0].text
-                ):
-                    response = "\n".join(
-                        [p.text for p in event.content.parts if p.text]
+    async def stream(self, query:str, session_id:str, priority:int = 0):
+        """
+        Runs one host turn, yielding "thinking" updates and then the final answer.
+
+        Turns go through the admission controller first. If the host can't start this
+        one in time, a single final item is yielded with a JSON-RPC busy `error`.
+        A turn stopped with `cancel()` ends with a final item marked "canceled".
+        """
+        try:
+            async with self._admission.admit(session_id=session_id, priority=priority):
+                session = await self._runner.session_service.get_session(
+                    app_name=self._runner.app_name, user_id=self._user_id, session_id=session_id
+                )
+                content = Content(role="user",parts=[Part.from_text(text=query)])
+                if session is None:
+                    session = await self._runner.session_service.create_session(
+                        app_name=self._runner.app_name,
+                        user_id=self._user_id,
+                        state={},
+                        session_id=session_id,
                     )
-                yield {
-                    "is_task_complete": True,
-                    "content": response,
-                }
-            else:
-                yield {
-                    "is_task_complete": False,
-                    "updates": "The host agent is thinking...",
-                }
+
+                # The runner feeds one queue and friend progress (from streaming friends)
+                # feeds the same one, so progress reaches the caller while a tool call is
+                # still waiting on the slowest friend.
+                updates:asyncio.Queue = asyncio.Queue()
+                token = _friend_updates.set(updates)
+                try:
+                    runner = asyncio.create_task(self._pump_events(session_id, content, updates))
+                finally:
+                    _friend_updates.reset(token)
+                self._turns[session_id] = runner
+                try:
+                    while True:
+                        kind, item = await updates.get()
+                        if kind == "done":
+                            break
+                        if kind == "error":
+                            raise item
+                        if kind == "friend":
+                            yield {"is_task_complete": False, "updates": item}
+                        elif item.is_final_response():
+                            # Yield the final response content when processing is complete, otherwise stream a "thinking" status update.
+                            response = ""
+                            if (
+                                item.content
+                                and item.content.parts
+                                and item.content.parts[0].text
+                            ):
+                                response = "\n".join(
+                                    [p.text for p in item.content.parts if p.text]
+                                )
+                            yield {
+                                "is_task_complete": True,
+                                "content": response,
+                            }
+                        else:
+                            yield {
+                                "is_task_complete": False,
+                                "updates": "The host agent is thinking...",
+                            }
+                    if runner.cancelled():
+                        yield {"is_task_complete": True, "content": "The request was canceled.", "canceled": True}
+                finally:
+                    if not runner.done():
+                        runner.cancel()
+                    if self._turns.get(session_id) is runner:
+                        del self._turns[session_id]
+        except AdmissionRejected as e:
+            yield {
+                "is_task_complete": True,
+                "content": e.message,
+                "error": e.to_jsonrpc_error(),
+            }
+
+    async def cancel(self, session_id:str) -> bool:
+        """
+        Stops the turn running for `session_id` and waits until it has unwound.
+
+        Cancelling the turn cancels the LLM call and every friend request it's waiting
+        on; friends that were streaming a task are also asked to cancel it. The turn's
+        `stream()` ends with a final item marked "canceled". Returns False if the session
+        had no turn running.
+        """
+        runner = self._turns.get(session_id)
+        if runner is None or runner.done():
+            return False
+        runner.cancel()
+        await asyncio.wait([runner])
+        return True
+
+    async def _pump_events(self, session_id:str, content:Content, updates:asyncio.Queue):
+        try:
+            with telemetry.span("llm.turn", agent=self._agent.name):
+                async for event in self._runner.run_async(
+                    user_id=self._user_id, session_id = session_id, new_message=content
+                ):
+                    updates.put_nowait(("event", event))
+        except Exception as e:
+            updates.put_nowait(("error", e))
+        finally:
+            updates.put_nowait(("done", None))
+
+    def _forward_friend_update(self, event:TaskCallbackArg, card:AgentCard):
+        updates = _friend_updates.get()
+        if updates is None:
+            return
+        if isinstance(event, TaskStatusUpdateEvent):
+            text = " ".join(
+                part.root.text for part in (event.status.message.parts if event.status.message else ())
+                if hasattr(part.root, "text")
+            )
+            updates.put_nowait(("friend", f"{card.name}: {text or event.status.state.value}"))
+        elif isinstance(event, TaskArtifactUpdateEvent):
+            updates.put_nowait(("friend", f"{card.name} sent a result."))
 
     async def send_message(self, agent_name:str, task:str, tool_context:ToolContext):
+        state = tool_context.state
+        task_id = state.get("task_id")  # Only set when continuing a task the friend already knows
+        context_id = state.get("context_id",str(uuid.uuid4()))
+        return await self._send_to_agent(agent_name, task, task_id, context_id)
+
+    async def send_message_to_many(self, agent_names:list[str], task:str, tool_context:ToolContext):
+        """
+        Sends the same task to several friend agents at once and gathers their replies.
+
+        Every friend is contacted concurrently, each under its own deadline, so a
+        round costs as much as the slowest friend rather than the sum of all of them.
+        Results are partial: a friend that fails or times out gets an error entry
+        while the others still report their answers. A streaming friend that times
+        out is also asked to cancel its task.
+
+        Returns:
+            dict mapping each agent name to {"status": "success", "parts": [...]}
+            or {"status": "error", "message": ...}.
+        """
+        state = tool_context.state
+        task_id = state.get("task_id")
+        context_id = state.get("context_id",str(uuid.uuid4()))
+        names = list(dict.fromkeys(agent_names))  # drop duplicates, keep order
+
+        async def _one(agent_name:str):
+            try:
+                parts = await asyncio.wait_for(
+                    self._send_to_agent(agent_name, task, task_id, context_id),
+                    timeout=PER_AGENT_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                return {
+                    "status": "error",
+                    "message": f"{agent_name} did not answer within {PER_AGENT_TIMEOUT_SECONDS:g} seconds.",
+                }
+            except CircuitOpenError:
+                return {"status": "error", "message": f"{agent_name} is unavailable right now (recent calls failed)."}
+            except Exception as e:
+                return {"status": "error", "message": f"{agent_name} failed: {e}"}
+            if parts is None:
+                return {"status": "error", "message": f"{agent_name} returned no task result."}
+            return {"status": "success", "parts": parts}
+
+        results = await asyncio.gather(*(_one(name) for name in names))
+        return dict(zip(names, results))
+
+    async def _send_to_agent(self, agent_name:str, task:str, task_id:str|None, context_id:str):
         if agent_name not in self.remote_agent_connections:
             raise ValueError("no such agent exists")
         client = self.remote_agent_connections[agent_name]
         if not client:
             raise ValueError("client not found")
-        state = tool_context.state
-        task_id = state.get("task_id",str(uuid.uuid4()))
-        context_id = state.get("context_id",str(uuid.uuid4()))
         message_id = str(uuid.uuid4())
 
         payload = {
@@ -180,62 +429,60 @@ class HostAgent:
                 "role":"user",
                 "parts":[{"type":"text", "text":task}],
                 "messageId":message_id,
-                "taskId":task_id,
                 "contextId":context_id
             },
-        }       
+        }
+        if task_id is not None:
+            # A2A servers reject task ids they never issued, so new conversations send none
+            payload["message"]["taskId"] = task_id       
+
+        if client.supports_streaming:
+            # Events arrive as the friend works; progress goes out through `_forward_friend_update`
+            result = await client.send_message_streaming(
+                SendStreamingMessageRequest(id=message_id, params=MessageSendParams.model_validate(payload))
+            )
+            if isinstance(result, Message):
+                return [compact_part(part) for part in result.parts]
+            if result is None:
+                logger.warning("%s sent an empty stream", agent_name)
+                return
+            return task_parts(result)
 
         message_request = SendMessageRequest(
             id=message_id,
             params=MessageSendParams.model_validate(payload)
         )
         send_message_response : SendMessageResponse = await client.send_message(message_request=message_request)
-        print("send_response", send_message_response)
-        if not isinstance(
-            send_message_response.root, SendMessageSuccessResponse
-        ) or not isinstance(send_message_response.root.result, Task):
-            print("Received a non-success or non-task response. Cannot proceed.")
+        if not isinstance(send_message_response.root, SendMessageSuccessResponse):
+            logger.warning("%s sent a non-success response: %s", agent_name, send_message_response.root)
             return
+        if isinstance(send_message_response.root.result, Message):
+            # Friends may answer directly with a message instead of a task
+            return [compact_part(part) for part in send_message_response.root.result.parts]
 
-        response_content = send_message_response.root.model_dump_json(exclude_none=True)
-        json_content = json.loads(response_content)
-        resp = []
+        # Read the parts straight off the typed Task rather than dumping it to JSON and back
+        return task_parts(send_message_response.root.result)
 
-        # This block navigates the nested JSON structure by first checking for 
-        # "result" and "artifacts" keys. For each artifact found, if it contains 
-        # a "parts" field, those parts are added to the resp list.
 
-        if json_content.get("result", {}).get("artifacts"):
-            for artifact in json_content["result"]["artifacts"]:
-                if artifact.get("parts"):
-                    resp.extend(artifact["parts"])
-        return resp
+def build(remote_agent_addresses:list[str]|None = None, **kwargs)->Agent:
+    """
+    Creates the host's ADK agent. Loads .env but makes no network calls: the friends'
+    cards are resolved on the first turn. kwargs go to `HostAgent` (e.g. `model`, `resilience_policy`).
+    """
+    from dotenv import load_dotenv
 
+    load_dotenv()
+    host = HostAgent(
+        remote_agent_addresses=DEFAULT_FRIEND_URLS if remote_agent_addresses is None else remote_agent_addresses,
+        **kwargs,
+    )
+    logger.info("HostAgent built for %s", ", ".join(host._remote_agent_addresses))
+    return host._agent
 
-def _get_initialized_host_agent():
-    async def _async_main():
-        friend_agent_urls = [
-            "http://localhost:10002",  # uno's Agent
-            "http://localhost:10003",  # dos's Agent
-            "http://localhost:10004",  # tres's Agent
-        ]
-        print("initializing host agent")
-        hosting_agent_instance = await HostAgent.create(
-            remote_agent_addresses=friend_agent_urls
-        )
-        print("HostAgent initialized")
-        return hosting_agent_instance.create_agent()
-    try:
-        asyncio.run(_async_main())
-    except RuntimeError as e:
-        if "asyncio.run() cannot be called from a running event loop" in str(e):
-            print(
-                f"Warning: Could not initialize HostAgent with asyncio.run(): {e}. "
-                "This can happen if an event loop is already running (e.g., in Jupyter). "
-                "Consider initializing HostAgent within an async function in your application."
-            )
-        else:
-            raise
 
-if __name__ == "__main__":
-    root_agent = _get_initialized_host_agent()
\ No newline at end of file
+def __getattr__(name):
+    # `root_agent` is built once, the first time something (e.g. `adk web`) asks for it
+    if name == "root_agent":
+        agent = globals()["root_agent"] = build()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,48 @@
+from a2a.types import Artifact, DataPart, FilePart, Part, Task, TaskArtifactUpdateEvent, TextPart
+
+
+def compact_part(part: Part) -> dict:
+    """One part as the small dict the host LLM sees: {"kind": ..., <payload>}, no metadata."""
+    root = part.root
+    if isinstance(root, TextPart):
+        return {"kind": "text", "text": root.text}
+    if isinstance(root, DataPart):
+        return {"kind": "data", "data": root.data}
+    if isinstance(root, FilePart):
+        return {"kind": "file", "file": root.file.model_dump(mode="json", by_alias=True, exclude_none=True)}
+    return root.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+
+def task_parts(task: Task) -> list[dict]:
+    """Parts of every artifact on `task`, read straight off the model (no dump/reparse)."""
+    return [compact_part(part) for artifact in task.artifacts or () for part in artifact.parts]
+
+
+class ArtifactAssembler:
+    """
+    Rebuilds artifacts from streamed `TaskArtifactUpdateEvent` chunks.
+
+    A chunk with `append` adds its parts to the artifact with the same id;
+    otherwise it replaces it. Artifacts keep the order they first appeared in.
+    """
+
+    def __init__(self) -> None:
+        self._artifacts: dict[str, Artifact] = {}
+
+    def add(self, event: TaskArtifactUpdateEvent) -> None:
+        artifact = event.artifact
+        existing = self._artifacts.get(artifact.artifact_id)
+        if event.append and existing is not None:
+            existing.parts.extend(artifact.parts)
+        else:
+            # Copy the part list so appending later never mutates the caller's event
+            self._artifacts[artifact.artifact_id] = artifact.model_copy(update={"parts": list(artifact.parts)})
+
+    def add_task(self, task: Task) -> None:
+        # A full Task snapshot supersedes any chunks seen for the same artifacts
+        for artifact in task.artifacts or ():
+            self._artifacts[artifact.artifact_id] = artifact.model_copy(update={"parts": list(artifact.parts)})
+
+    @property
+    def artifacts(self) -> list[Artifact]:
+        return list(self._artifacts.values())
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from typing import Iterable
+
+import numpy as np
+
+from .schedule import DEFAULT_COURT, CourtSchedule, parse_date
+
+# A day's slots as bits of one uint64 (bit i = i-th slot after opening), so a
+# party's availability over D days is a length-D array and N parties stack into
+# an (N, D) matrix that intersects with plain bitwise ops.
+MAX_SLOTS_PER_DAY = 64
+
+
+def _range_bits(schedule: CourtSchedule, start: int, end: int) -> int:
+    """Bits for the slots fully inside [start, end) (minutes since midnight)."""
+    slot = schedule.slot_minutes
+    lo = max(-(-(start - schedule.open_time) // slot), 0)  # first slot starting at/after `start`
+    hi = min((end - schedule.open_time) // slot, (schedule.close_time - schedule.open_time) // slot)
+    if hi <= lo:
+        return 0
+    return ((1 << hi) - 1) ^ ((1 << lo) - 1)
+
+
+def court_bitmap(schedule: CourtSchedule, dates: list[str], court: str = DEFAULT_COURT) -> np.ndarray:
+    """(D,) free-slot bitmap of `court`; days the court isn't open are all zeros."""
+    bitmap = np.zeros(len(dates), dtype=np.uint64)
+    for d, date_str in enumerate(dates):
+        day = schedule.day(date_str, court)
+        if day is None:
+            continue
+        bits = 0
+        for start, end in day.free_windows():
+            bits |= _range_bits(schedule, start, end)
+        bitmap[d] = bits
+    return bitmap
+
+
+def party_bitmaps(
+    schedule: CourtSchedule, dates: list[str], ranges: dict[str, Iterable[tuple[str, int, int]]]
+) -> tuple[list[str], np.ndarray]:
+    """(N, D) bitmap of when each party said they're free, from (date, start, end) ranges."""
+    parties = list(ranges)
+    column = {date_str: d for d, date_str in enumerate(dates)}
+    bitmaps = np.zeros((len(parties), len(dates)), dtype=np.uint64)
+    for p, party in enumerate(parties):
+        for date_str, start, end in ranges[party]:
+            d = column.get(date_str)
+            if d is not None:
+                bitmaps[p, d] |= np.uint64(_range_bits(schedule, start, end))
+    return parties, bitmaps
+
+
+def window_starts(bitmaps: np.ndarray, length: int) -> np.ndarray:
+    """Bit i stays set only if slots i..i+length-1 are all set (a run of `length` starting at i)."""
+    runs = bitmaps.copy()
+    for shift in range(1, length):
+        runs &= bitmaps >> np.uint64(shift)
+    return runs
+
+
+def rank_windows(
+    schedule: CourtSchedule,
+    start_date: str,
+    end_date: str,
+    ranges: dict[str, Iterable[tuple[str, int, int]]],
+    duration_minutes: int,
+    court: str = DEFAULT_COURT,
+    min_parties: int = 1,
+    limit: int = 5,
+) -> list[dict]:
+    """
+    Court-free windows of `duration_minutes` in [start_date, end_date], best first.
+
+    Windows are ranked by how many parties can make the whole window, then by
+    date and time. Each result is {"date", "start", "end", "available", "missing"}
+    with times as minutes since midnight.
+    """
+    slots_per_day = (schedule.close_time - schedule.open_time) // schedule.slot_minutes
+    if slots_per_day > MAX_SLOTS_PER_DAY:
+        raise ValueError(f"At most {MAX_SLOTS_PER_DAY} slots per day are supported")
+    if duration_minutes <= 0 or duration_minutes % schedule.slot_minutes:
+        raise ValueError(f"Duration must be a positive multiple of {schedule.slot_minutes} minutes")
+    length = duration_minutes // schedule.slot_minutes
+    if length > slots_per_day:
+        return []
+
+    first, last = parse_date(start_date), parse_date(end_date)
+    dates = [(first + timedelta(days=offset)).isoformat() for offset in range((last - first).days + 1)]
+    if not dates:
+        return []
+
+    parties, bitmaps = party_bitmaps(schedule, dates, ranges)
+    court_runs = window_starts(court_bitmap(schedule, dates, court), length)  # (D,)
+    party_runs = window_starts(bitmaps, length) & court_runs                  # (N, D)
+
+    # Unpack to (N, D, S) booleans and count, per (day, start slot), who can make it
+    slot_bits = np.arange(slots_per_day, dtype=np.uint64)
+    can_make = ((party_runs[..., None] >> slot_bits) & np.uint64(1)).astype(bool)
+    attendees = can_make.sum(axis=0)                                          # (D, S)
+    court_free = ((court_runs[:, None] >> slot_bits) & np.uint64(1)).astype(bool)
+    attendees[~court_free] = -1
+
+    # Most attendees first; the flattened (day, slot) index is chronological, so a
+    # stable sort leaves ties earliest-first
+    flat = attendees.ravel()
+    candidates = np.flatnonzero(flat >= max(min_parties, 0))
+    order = candidates[np.argsort(-flat[candidates], kind="stable")][:limit]
+
+    results = []
+    for index in order:
+        d, s = divmod(int(index), slots_per_day)
+        start = schedule.open_time + s * schedule.slot_minutes
+        available = [party for p, party in enumerate(parties) if can_make[p, d, s]]
+        results.append({
+            "date": dates[d],
+            "start": start,
+            "end": start + duration_minutes,
+            "available": available,
+            "missing": [party for party in parties if party not in available],
+        })
+    return results
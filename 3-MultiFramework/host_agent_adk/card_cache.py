@@ -0,0 +1,86 @@
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+
+import httpx
+from a2a.types import AgentCard
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+_MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)")
+
+
+@dataclass
+class _CachedCard:
+    card: AgentCard
+    etag: str | None
+    expires_at: float
+
+
+class AgentCardCache:
+    """
+    Caches friend agent cards by address and revalidates them with ETag/If-None-Match.
+
+    A card is served from memory until its TTL runs out (the server's
+    Cache-Control max-age wins over `ttl` when present). After that we send
+    the stored ETag, and an unchanged card costs a bodiless 304.
+    """
+
+    def __init__(
+        self,
+        get_client,
+        ttl: float = 300.0,
+        fetch_timeout: float = 10.0,
+        card_path: str = AGENT_CARD_WELL_KNOWN_PATH,
+    ) -> None:
+        # `get_client` is a callable so the cache always uses the live pooled client.
+        self._get_client = get_client
+        self.ttl = ttl
+        self.fetch_timeout = fetch_timeout
+        self.card_path = card_path.lstrip("/")
+        self._entries: dict[str, _CachedCard] = {}
+
+    async def get(self, address: str) -> AgentCard:
+        entry = self._entries.get(address)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry.card
+        return await self._fetch(address, entry)
+
+    async def resolve_all(self, addresses: list[str]) -> dict[str, AgentCard | Exception]:
+        """Resolves every address concurrently; each result is a card or the error it raised."""
+
+        async def _one(address: str):
+            return await asyncio.wait_for(self.get(address), timeout=self.fetch_timeout)
+
+        results = await asyncio.gather(*(_one(a) for a in addresses), return_exceptions=True)
+        return dict(zip(addresses, results))
+
+    def invalidate(self, address: str) -> None:
+        self._entries.pop(address, None)
+
+    async def _fetch(self, address: str, entry: _CachedCard | None) -> AgentCard:
+        url = f"{address.rstrip('/')}/{self.card_path}"
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+
+        response = await self._get_client().get(url, headers=headers, timeout=self.fetch_timeout)
+        expires_at = time.monotonic() + self._ttl_for(response)
+
+        if response.status_code == 304 and entry is not None:
+            entry.expires_at = expires_at
+            return entry.card
+
+        response.raise_for_status()
+        card = AgentCard.model_validate_json(response.content)
+        self._entries[address] = _CachedCard(
+            card=card, etag=response.headers.get("etag"), expires_at=expires_at
+        )
+        return card
+
+    def _ttl_for(self, response: httpx.Response) -> float:
+        cache_control = response.headers.get("cache-control", "")
+        if "no-store" in cache_control or "no-cache" in cache_control:
+            return 0.0
+        match = _MAX_AGE_RE.search(cache_control)
+        return float(match.group(1)) if match else self.ttl
@@ -1,40 +1,270 @@
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from contextlib import aclosing
+from dataclasses import dataclass, field
 import httpx
 from a2a.types import AgentCard
 from a2a.client import A2AClient
+from a2a.client.errors import A2AClientJSONRPCError
 from a2a.types import (
+    CancelTaskRequest,
+    JSONRPCErrorResponse,
+    Message,
     SendMessageRequest,
     SendMessageResponse,
+    SendStreamingMessageRequest,
     Task,
+    TaskIdParams,
+    TaskState,
+    TaskStatus,
     TaskStatusUpdateEvent,
     TaskArtifactUpdateEvent,
 )
-from typing import Callable
-from dotenv import load_dotenv
+from typing import Awaitable, Callable
+from .artifacts import ArtifactAssembler
+from .resilience import AgentHealth, CircuitOpenError, ResiliencePolicy, RetryBudget, call_with_resilience
+from .telemetry import telemetry
+from .transport import get_transport
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+class StreamCanceledError(Exception):
+    """A stream was canceled before the friend sent anything that names a task."""
+
+
+@dataclass
+class _StreamState:
+    """What a stream has delivered so far; kept outside the reader task so it survives a cancel."""
+    task: Task | None = None
+    assembler: ArtifactAssembler = field(default_factory=ArtifactAssembler)
 
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
-TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
+TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Awaitable[None] | None]
 # equivalent of saying this:
-# def TaskUpdateCallback(arg: TaskCallbackArg, card: AgentCard) -> Task:
+# def TaskUpdateCallback(arg: TaskCallbackArg, card: AgentCard) -> None: (or async def)
 
 
 class RemoteAgentConnection:
-    def __init__(self, agent_card: AgentCard, agent_url: str) -> None:
-        print(f"agent_card: {agent_card}")
-        print(f"agent_url: {agent_url}")
-        self._httpx_client = httpx.AsyncClient(timeout=30)
+    def __init__(
+        self,
+        agent_card: AgentCard,
+        agent_url: str,
+        httpx_client: httpx.AsyncClient | None = None,
+        task_callback: TaskUpdateCallback | None = None,
+        policy: ResiliencePolicy | None = None,
+    ) -> None:
+        logger.debug("connecting to %s at %s", agent_card.name, agent_url)
+        # Connections share the process-wide pooled client unless one is passed in,
+        # so keep-alive sockets to each friend are reused across calls.
+        self._httpx_client = httpx_client or get_transport().get_client()
         self.agent_client = A2AClient(self._httpx_client, agent_card, url=agent_url)
         self.card = agent_card
         self.conversation_name = None
         self.conversation = None
-        self.pending_tasks = set()
+        # Remote task ids with a stream still open, and the asyncio task reading each one
+        # (a child of the caller's task, so cancelling it stops only that stream)
+        self.pending_tasks: set[str] = set()
+        self._streams: dict[str, asyncio.Task] = {}
+        self._remote_cancels: set[asyncio.Task] = set()
+        self._callbacks: list[TaskUpdateCallback] = [task_callback] if task_callback else []
+        # Circuit breaker, latency/error tracking and retry budget for this friend
+        self.policy = policy or ResiliencePolicy()
+        self.health = AgentHealth(self.policy)
+        self._retry_budget = RetryBudget(self.policy.retry_ratio, self.policy.max_retry_tokens)
 
     def get_agent(self) -> AgentCard:
         return self.card
 
+    @property
+    def supports_streaming(self) -> bool:
+        return bool(self.card.capabilities and self.card.capabilities.streaming)
+
+    def add_task_callback(self, callback: TaskUpdateCallback) -> None:
+        self._callbacks.append(callback)
+
+    def remove_task_callback(self, callback: TaskUpdateCallback) -> None:
+        self._callbacks.remove(callback)
+
     async def send_message(
         self, message_request: SendMessageRequest
     ) -> SendMessageResponse:
-        return await self.agent_client.send_message(message_request)
+        """
+        Sends a message and waits for the reply, behind this friend's circuit breaker.
+
+        Raises CircuitOpenError right away while the friend is marked unhealthy.
+        Connect errors and 502/503/504 answers are retried with jitter within the retry
+        budget; timeouts are not, since the friend may still act on the message. A slow
+        call may be hedged if the policy allows it (see `ResiliencePolicy`).
+        """
+        return await self._observed(
+            lambda: call_with_resilience(
+                self.health, self._retry_budget, lambda: self.agent_client.send_message(message_request)
+            )
+        )
+
+    async def send_message_streaming(
+        self, message_request: SendStreamingMessageRequest
+    ) -> Task | Message | None:
+        """
+        Sends a message over the A2A streaming call and follows the task to the end.
+
+        Every status and artifact event is passed to the registered callbacks as it
+        arrives, and the task id sits in `pending_tasks` while its stream is open.
+        Returns the final Task (with artifacts rebuilt from the chunks), the Message
+        if the friend answered without a task, or None if the stream was empty.
+
+        If the caller is cancelled (e.g. a timeout) the stream is closed and the
+        friend is asked to cancel the task as well. A task stopped through
+        `cancel_task()` instead returns normally, as a canceled Task holding
+        whatever artifacts had arrived, or raises StreamCanceledError if no task
+        had arrived yet.
+        """
+        return await self._observed(lambda: self._follow_stream(message_request), streaming=True)
+
+    async def _follow_stream(self, message_request: SendStreamingMessageRequest) -> Task | Message | None:
+        # Events go to callbacks as they arrive, so a stream is never retried or hedged;
+        # it only checks the circuit and reports how the call went
+        if not self.health.allow():
+            raise CircuitOpenError("circuit open after repeated failures")
+        started = time.monotonic()
+        stream = _StreamState()
+        # The stream is read in its own task, which is what `cancel_task()` cancels:
+        # stopping one friend's stream must not cancel whoever is waiting on it here
+        reader = asyncio.create_task(self._read_stream(message_request, stream))
+        try:
+            await asyncio.wait([reader])
+        except asyncio.CancelledError:
+            # Our caller gave up (e.g. a timeout): stop reading as well
+            reader.cancel()
+            self.health.release_probe()
+            raise
+
+        if reader.cancelled():
+            # Stopped through `cancel_task()`: says nothing about the friend's health, so
+            # only free the half-open probe slot; hand back what arrived, marked canceled
+            self.health.release_probe()
+            if stream.task is None:
+                raise StreamCanceledError(f"the stream to {self.card.name} was canceled before a task arrived")
+            task = stream.task.model_copy(update={"status": TaskStatus(state=TaskState.canceled)})
+            return task.model_copy(update={"artifacts": stream.assembler.artifacts or task.artifacts})
+
+        try:
+            result = reader.result()
+        except Exception:
+            self.health.record_failure()
+            raise
+        # Every answer counts as a success, a direct Message included; skipping it would
+        # leave a half-open circuit waiting on its probe forever
+        self.health.record_success(time.monotonic() - started)
+        if result is None or isinstance(result, Message):
+            return result
+        return result.model_copy(update={"artifacts": stream.assembler.artifacts or result.artifacts})
+
+    async def _read_stream(
+        self, message_request: SendStreamingMessageRequest, stream: _StreamState
+    ) -> Task | Message | None:
+        try:
+            # aclosing: leaving early (final event, cancel) closes the HTTP stream right away
+            async with aclosing(self.agent_client.send_message_streaming(message_request)) as responses:
+                async for response in responses:
+                    event = response.root
+                    if isinstance(event, JSONRPCErrorResponse):
+                        raise A2AClientJSONRPCError(event)
+                    event = event.result
+                    if isinstance(event, Message):
+                        return event
+
+                    if stream.task is None:
+                        self._track(event.task_id if not isinstance(event, Task) else event.id)
+                    if isinstance(event, Task):
+                        stream.task = event
+                        stream.assembler.add_task(event)
+                    elif isinstance(event, TaskStatusUpdateEvent):
+                        stream.task = (stream.task or self._empty_task(event)).model_copy(update={"status": event.status})
+                    elif isinstance(event, TaskArtifactUpdateEvent):
+                        stream.task = stream.task or self._empty_task(event)
+                        stream.assembler.add(event)
+                    await self._notify(event)
+
+                    if isinstance(event, TaskStatusUpdateEvent) and event.final:
+                        break
+        except asyncio.CancelledError:
+            task = stream.task
+            if task is not None and task.id in self.pending_tasks:
+                # Don't leave the friend working on something nobody will read
+                cancel = asyncio.create_task(self._cancel_remote(task.id))
+                self._remote_cancels.add(cancel)
+                cancel.add_done_callback(self._remote_cancels.discard)
+            raise
+        finally:
+            if stream.task is not None:
+                self.pending_tasks.discard(stream.task.id)
+                self._streams.pop(stream.task.id, None)
+        return stream.task
+
+    async def cancel_task(self, task_id: str) -> None:
+        """Stops reading `task_id`'s stream (if open here) and asks the friend to cancel it."""
+        reader = self._streams.get(task_id)
+        if reader is not None and reader is not asyncio.current_task():
+            # The reader's CancelledError handler sends the remote cancel
+            reader.cancel()
+            return
+        await self._cancel_remote(task_id)
+
+    async def cancel_pending(self) -> None:
+        """Cancels every task this connection is still streaming (the stragglers)."""
+        await asyncio.gather(*(self.cancel_task(task_id) for task_id in list(self.pending_tasks)))
+
+    async def _observed(self, call: Callable[[], Awaitable], **attributes):
+        # Per-friend latency and outcome; skipped entirely while telemetry is off
+        if not telemetry.enabled:
+            return await call()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with telemetry.span("remote.call", agent=self.card.name, **attributes):
+                result = await call()
+            canceled = isinstance(result, Task) and result.status.state == TaskState.canceled
+            outcome = "canceled" if canceled else "success"
+            return result
+        except asyncio.CancelledError:
+            outcome = "canceled"
+            raise
+        except CircuitOpenError:
+            outcome = "circuit_open"
+            raise
+        finally:
+            telemetry.observe_remote_call(self.card.name, outcome, time.perf_counter() - started)
+
+    def _track(self, task_id: str) -> None:
+        self.pending_tasks.add(task_id)
+        current = asyncio.current_task()
+        if current is not None:
+            self._streams[task_id] = current
+
+    @staticmethod
+    def _empty_task(event: TaskStatusUpdateEvent | TaskArtifactUpdateEvent) -> Task:
+        return Task(id=event.task_id, context_id=event.context_id, status=TaskStatus(state=TaskState.working))
+
+    async def _notify(self, event: TaskCallbackArg) -> None:
+        for callback in self._callbacks:
+            try:
+                result = callback(event, self.card)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                # A broken observer mustn't break the call it's watching
+                logger.error("task callback failed for %s: %r", self.card.name, e)
+
+    async def _cancel_remote(self, task_id: str) -> None:
+        try:
+            await self.agent_client.cancel_task(
+                CancelTaskRequest(id=str(uuid.uuid4()), params=TaskIdParams(id=task_id))
+            )
+        except Exception as e:
+            logger.error("failed to cancel task %s on %s: %r", task_id, self.card.name, e)
@@ -0,0 +1,216 @@
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from a2a.client.errors import A2AClientHTTPError
+
+from .transport import TransportConfig
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a friend whose circuit is open (it's been failing)."""
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    """
+    How hard to try each friend agent.
+
+    - attempt_timeout: deadline for a single attempt. No shorter than the transport's
+      read timeout, so a friend that's slow but healthy still gets to answer.
+    - The circuit opens when at least `min_calls` of the last `window` calls were
+      made and `failure_rate` of them failed; it stays open `open_seconds`, then
+      lets one probe through (half-open) and closes again if the probe succeeds.
+    - Retries use full-jitter backoff and are capped by a budget: each call adds
+      `retry_ratio` tokens (up to `max_retry_tokens`), each retry spends one.
+      Only calls the friend never got to act on are retried (see `is_retryable`).
+    - hedge: after the friend's p95 latency (at least `hedge_min_delay`) without
+      an answer, send a duplicate and take whichever returns first. The friend
+      then handles the message twice, so only turn it on for friends where
+      that's harmless.
+    """
+    attempt_timeout: float = TransportConfig.timeout
+    window: int = 20
+    min_calls: int = 5
+    failure_rate: float = 0.5
+    open_seconds: float = 30.0
+    max_retries: int = 2
+    retry_base_delay: float = 0.2
+    retry_max_delay: float = 2.0
+    retry_ratio: float = 0.2
+    max_retry_tokens: float = 10.0
+    hedge: bool = False
+    hedge_min_delay: float = 0.05
+    ewma_alpha: float = 0.2
+
+
+class AgentHealth:
+    """Latency EWMA, recent error rate and circuit breaker state for one friend."""
+
+    def __init__(self, policy: ResiliencePolicy) -> None:
+        self.policy = policy
+        self.state = CLOSED
+        self.latency_ewma: float | None = None
+        self._outcomes: deque[bool] = deque(maxlen=policy.window)  # True = failed
+        self._latencies: deque[float] = deque(maxlen=100)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def is_available(self) -> bool:
+        """False while the circuit is open and still cooling down."""
+        return self.state != OPEN or time.monotonic() - self._opened_at >= self.policy.open_seconds
+
+    def p95(self) -> float | None:
+        if len(self._latencies) < 20:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.policy.open_seconds:
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self, latency: float) -> None:
+        alpha = self.policy.ewma_alpha
+        self.latency_ewma = latency if self.latency_ewma is None else alpha * latency + (1 - alpha) * self.latency_ewma
+        self._latencies.append(latency)
+        self._outcomes.append(False)
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self._probe_in_flight = False
+            self._outcomes.clear()
+
+    def record_failure(self) -> None:
+        self._outcomes.append(True)
+        if self.state == HALF_OPEN or (
+            len(self._outcomes) >= self.policy.min_calls and self.error_rate >= self.policy.failure_rate
+        ):
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        # The half-open probe was abandoned (cancelled) without an outcome: let the next call probe
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "latency_ewma": self.latency_ewma,
+            "error_rate": self.error_rate,
+            "p95": self.p95(),
+        }
+
+
+class RetryBudget:
+    """Token bucket that keeps retries to a fraction of calls, so retries can't snowball."""
+
+    def __init__(self, ratio: float, max_tokens: float) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+def is_retryable(error: BaseException) -> bool:
+    # message/send isn't idempotent and friends don't dedupe, so only retry what the
+    # friend can't have acted on: a connection that was never made, or a 502/503/504.
+    # A timeout or a dropped connection may mean the friend is still working on it.
+    if isinstance(error, A2AClientHTTPError):
+        if isinstance(error.__cause__, httpx.RequestError):
+            # The SDK reports every network error as a 503; look at what really happened
+            return _never_sent(error.__cause__)
+        return error.status_code in (502, 503, 504)
+    return _never_sent(error)
+
+
+def _never_sent(error: BaseException) -> bool:
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+async def call_with_resilience(
+    health: AgentHealth,
+    budget: RetryBudget,
+    attempt: Callable[[], Awaitable[T]],
+) -> T:
+    """Runs `attempt` behind the circuit breaker, with budgeted retries and optional hedging."""
+    policy = health.policy
+    if not health.allow():
+        raise CircuitOpenError("circuit open after repeated failures")
+    budget.deposit()
+
+    retries = 0
+    while True:
+        started = time.monotonic()
+        try:
+            result = await _hedged(health, budget, attempt)
+        except asyncio.CancelledError:
+            health.release_probe()
+            raise
+        except Exception as e:
+            health.record_failure()
+            if retries >= policy.max_retries or not is_retryable(e) or not budget.withdraw():
+                raise
+            retries += 1
+            # Full jitter: anywhere between 0 and the capped exponential delay
+            await asyncio.sleep(random.uniform(0, min(policy.retry_max_delay, policy.retry_base_delay * 2 ** retries)))
+            if not health.allow():
+                raise CircuitOpenError("circuit opened while retrying") from e
+            continue
+        health.record_success(time.monotonic() - started)
+        return result
+
+
+async def _hedged(health: AgentHealth, budget: RetryBudget, attempt: Callable[[], Awaitable[T]]) -> T:
+    policy = health.policy
+    p95 = health.p95() if policy.hedge else None
+    if p95 is None:
+        return await asyncio.wait_for(attempt(), timeout=policy.attempt_timeout)
+
+    first = asyncio.ensure_future(asyncio.wait_for(attempt(), timeout=policy.attempt_timeout))
+    pending = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=max(p95, policy.hedge_min_delay))
+        if not done and budget.withdraw():
+            # Slower than usual: race a duplicate against it
+            pending.add(asyncio.ensure_future(asyncio.wait_for(attempt(), timeout=policy.attempt_timeout)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        # Every attempt failed: surface the first one's error
+        return first.result()
+    finally:
+        for future in pending:
+            future.cancel()
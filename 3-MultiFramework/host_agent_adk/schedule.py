@@ -0,0 +1,343 @@
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable, NamedTuple
+
+# Times inside a day are plain ints: minutes since midnight ("09:30" -> 570)
+DEFAULT_COURT = "court-1"
+
+
+class BookingError(ValueError):
+    """A booking was rejected: bad input, court closed, or the time is taken."""
+
+
+class VersionConflict(BookingError):
+    """The day changed since the caller read its version (compare-and-set failed)."""
+
+
+@dataclass(frozen=True)
+class Reservation:
+    date: str
+    start: int
+    end: int
+    party: str
+    court: str = DEFAULT_COURT
+
+
+def parse_hhmm(value: str) -> int:
+    hours, sep, minutes = value.partition(":")
+    if not sep or not hours.isdigit() or not minutes.isdigit() or len(minutes) != 2:
+        raise ValueError(f"Invalid time {value!r}, expected HH:MM")
+    total = int(hours) * 60 + int(minutes)
+    if int(minutes) >= 60 or total > 24 * 60:
+        raise ValueError(f"Invalid time {value!r}, expected HH:MM")
+    return total
+
+
+def format_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02}:{minutes % 60:02}"
+
+
+def parse_date(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+class _Bookings(NamedTuple):
+    """One immutable version of a day's bookings: parallel tuples ordered by start time."""
+    starts: tuple[int, ...] = ()
+    ends: tuple[int, ...] = ()
+    parties: tuple[str, ...] = ()
+    version: int = 0
+
+    def conflict(self, start: int, end: int) -> tuple[int, str] | None:
+        i = bisect_right(self.starts, start)
+        if i > 0 and self.ends[i - 1] > start:
+            return self.starts[i - 1], self.parties[i - 1]
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.starts[i], self.parties[i]
+        return None
+
+    def party_at(self, minute: int) -> str | None:
+        i = bisect_right(self.starts, minute) - 1
+        if i >= 0 and self.ends[i] > minute:
+            return self.parties[i]
+        return None
+
+    def inserted(self, start: int, end: int, party: str) -> "_Bookings":
+        # The next version with one more booking; the caller has checked the range is free
+        i = bisect_left(self.starts, start)
+        return _Bookings(
+            self.starts[:i] + (start,) + self.starts[i:],
+            self.ends[:i] + (end,) + self.ends[i:],
+            self.parties[:i] + (party,) + self.parties[i:],
+            self.version + 1,
+        )
+
+
+class DaySchedule:
+    """
+    Bookings for one court on one day, kept as sorted, non-overlapping intervals.
+
+    `starts`/`ends`/`parties` are parallel tuples ordered by start time, so
+    "is this range free?" and "who has this minute?" are a bisect plus one
+    neighbour check: O(log n) no matter how fine the slots are.
+    `version` goes up by one with every booking.
+
+    A booking never edits them in place: it builds the next `_Bookings` and
+    swaps it in with one assignment. Readers take `bookings` once and work on
+    that, so they need no lock and never see a half-inserted booking, even
+    while `CourtSchedule.book_many` writes from another thread.
+    """
+
+    __slots__ = ("open_time", "close_time", "bookings")
+
+    def __init__(self, open_time: int, close_time: int) -> None:
+        self.open_time = open_time
+        self.close_time = close_time
+        self.bookings = _Bookings()
+
+    @property
+    def version(self) -> int:
+        return self.bookings.version
+
+    def conflict(self, start: int, end: int) -> tuple[int, str] | None:
+        """First booking overlapping [start, end) as (start, party), or None if the range is free."""
+        return self.bookings.conflict(start, end)
+
+    def is_free(self, start: int, end: int) -> bool:
+        return self.open_time <= start < end <= self.close_time and self.conflict(start, end) is None
+
+    def party_at(self, minute: int) -> str | None:
+        return self.bookings.party_at(minute)
+
+    def insert(self, start: int, end: int, party: str) -> None:
+        # Caller has checked the range is free and holds the day's stripe lock
+        self.bookings = self.bookings.inserted(start, end, party)
+
+    def free_windows(self, start: int | None = None, end: int | None = None) -> list[tuple[int, int]]:
+        """Gaps between bookings within [start, end) (defaults to opening hours)."""
+        starts, ends, _, _ = self.bookings
+        lo = self.open_time if start is None else max(start, self.open_time)
+        hi = self.close_time if end is None else min(end, self.close_time)
+        windows = []
+        cursor = lo
+        i = max(bisect_right(starts, lo) - 1, 0)
+        while i < len(starts) and starts[i] < hi:
+            if ends[i] > cursor:
+                if starts[i] > cursor:
+                    windows.append((cursor, starts[i]))
+                cursor = ends[i]
+            i += 1
+        if cursor < hi:
+            windows.append((cursor, hi))
+        return windows
+
+
+def intersect_windows(a: list[tuple[int, int]], b: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Overlap of two sorted lists of disjoint intervals (two-pointer merge)."""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+class CourtSchedule:
+    """
+    Free/busy index for any number of courts over any number of days.
+
+    Each (court, date) the courts are open on gets a `DaySchedule`. Bookings
+    must line up with `slot_minutes` (60 gives the classic hourly slots).
+
+    Bookings are atomic: check-and-insert runs under a lock striped by
+    (court, date), so concurrent tool calls can't double-book, while bookings
+    on other days don't wait. Reads take no lock: each day publishes its
+    bookings as an immutable snapshot (see `DaySchedule`). Callers that read first can pass the day's
+    `version()` back as `expected_version` to fail instead of booking on
+    top of changes made in between (compare-and-set).
+    """
+
+    def __init__(
+        self,
+        open_time: str = "08:00",
+        close_time: str = "21:00",
+        slot_minutes: int = 60,
+        lock_stripes: int = 64,
+    ) -> None:
+        self.open_time = parse_hhmm(open_time)
+        self.close_time = parse_hhmm(close_time)
+        if slot_minutes <= 0 or (self.close_time - self.open_time) % slot_minutes:
+            raise ValueError("Opening hours must be a whole number of slots")
+        self.slot_minutes = slot_minutes
+        self.courts: list[str] = []
+        self._days: dict[tuple[str, str], DaySchedule] = {}
+        self._locks = [threading.Lock() for _ in range(lock_stripes)]
+
+    def _stripe(self, court: str, date_str: str) -> int:
+        return hash((court, date_str)) % len(self._locks)
+
+    # --- Opening days ----------------------------------------------------------
+
+    def open_days(self, start: date, days: int, courts: Iterable[str] = (DEFAULT_COURT,)) -> None:
+        for court in courts:
+            if court not in self.courts:
+                self.courts.append(court)
+            for offset in range(days):
+                key = (court, (start + timedelta(days=offset)).isoformat())
+                if key not in self._days:
+                    self._days[key] = DaySchedule(self.open_time, self.close_time)
+
+    def day(self, date_str: str, court: str = DEFAULT_COURT) -> DaySchedule | None:
+        return self._days.get((court, date_str))
+
+    # --- Queries ---------------------------------------------------------------
+
+    def version(self, date_str: str, court: str = DEFAULT_COURT) -> int | None:
+        day = self.day(date_str, court)
+        return None if day is None else day.version
+
+    def is_free(self, date_str: str, start: int, end: int, court: str = DEFAULT_COURT) -> bool:
+        day = self.day(date_str, court)
+        return day is not None and day.is_free(start, end)
+
+    def slots(self, date_str: str, court: str = DEFAULT_COURT) -> tuple[list[str], dict[str, str]]:
+        """Slot-by-slot view of a day: (free slot start times, {booked slot: party})."""
+        day = self.day(date_str, court)
+        if day is None:
+            return [], {}
+        bookings = day.bookings  # One version for the whole day, even if a booking lands meanwhile
+        available, booked = [], {}
+        for minute in range(day.open_time, day.close_time, self.slot_minutes):
+            party = bookings.party_at(minute)
+            if party is None:
+                available.append(format_hhmm(minute))
+            else:
+                booked[format_hhmm(minute)] = party
+        return available, booked
+
+    def common_free_windows(self, date_str: str, courts: Iterable[str] | None = None) -> list[tuple[int, int]]:
+        """Time ranges on `date_str` when every one of `courts` (default: all) is free."""
+        windows = None
+        for court in courts if courts is not None else self.courts:
+            day = self.day(date_str, court)
+            if day is None:
+                return []
+            free = day.free_windows()
+            windows = free if windows is None else intersect_windows(windows, free)
+            if not windows:
+                return []
+        return windows or []
+
+    def first_free_windows(
+        self,
+        start_date: str,
+        end_date: str,
+        duration_minutes: int,
+        courts: Iterable[str] | None = None,
+        limit: int = 5,
+    ) -> list[tuple[str, int, int]]:
+        """
+        First `limit` slot-aligned (date, start, end) windows of `duration_minutes`
+        in [start_date, end_date] when all of `courts` are free.
+        """
+        courts = list(courts) if courts is not None else self.courts
+        results = []
+        current, last = parse_date(start_date), parse_date(end_date)
+        while current <= last and len(results) < limit:
+            date_str = current.isoformat()
+            for window_start, window_end in self.common_free_windows(date_str, courts):
+                # Round up to the slot grid, then take every slot start that still fits
+                start = window_start + (-(window_start - self.open_time) % self.slot_minutes)
+                while start + duration_minutes <= window_end and len(results) < limit:
+                    results.append((date_str, start, start + duration_minutes))
+                    start += self.slot_minutes
+            current += timedelta(days=1)
+        return results
+
+    # --- Booking ---------------------------------------------------------------
+
+    def book(
+        self,
+        date_str: str,
+        start: int,
+        end: int,
+        party: str,
+        court: str = DEFAULT_COURT,
+        expected_version: int | None = None,
+    ) -> None:
+        versions = None if expected_version is None else {(court, date_str): expected_version}
+        self.book_many([Reservation(date_str, start, end, party, court)], versions)
+
+    def book_many(
+        self,
+        reservations: list[Reservation],
+        expected_versions: dict[tuple[str, str], int] | None = None,
+    ) -> None:
+        """
+        Books every reservation or none of them.
+
+        `expected_versions` maps (court, date) to the version the caller saw;
+        any mismatch raises `VersionConflict` and nothing is booked.
+        """
+        # Lock every touched stripe in a fixed order so two batches can't deadlock
+        stripes = sorted({self._stripe(r.court, r.date) for r in reservations})
+        for stripe in stripes:
+            self._locks[stripe].acquire()
+        try:
+            for (court, date_str), version in (expected_versions or {}).items():
+                if self.version(date_str, court) != version:
+                    raise VersionConflict(
+                        f"The schedule for {court} on {date_str} changed, please check availability again."
+                    )
+            for i, reservation in enumerate(reservations):
+                self._validate(reservation)
+                for other in reservations[:i]:
+                    if (
+                        (other.court, other.date) == (reservation.court, reservation.date)
+                        and other.start < reservation.end
+                        and reservation.start < other.end
+                    ):
+                        raise BookingError(
+                            f"The requested times {format_hhmm(other.start)}-{format_hhmm(other.end)} and "
+                            f"{format_hhmm(reservation.start)}-{format_hhmm(reservation.end)} on {reservation.date} overlap."
+                        )
+            # Build every touched day's next version first, then publish them together,
+            # so readers see the whole batch or none of it on each day
+            updated: dict[tuple[str, str], _Bookings] = {}
+            for reservation in reservations:
+                key = (reservation.court, reservation.date)
+                bookings = updated.get(key) or self._days[key].bookings
+                updated[key] = bookings.inserted(reservation.start, reservation.end, reservation.party)
+            for key, bookings in updated.items():
+                self._days[key].bookings = bookings
+        finally:
+            for stripe in stripes:
+                self._locks[stripe].release()
+
+    def _validate(self, reservation: Reservation) -> None:
+        date_str, start, end = reservation.date, reservation.start, reservation.end
+        day = self.day(date_str, reservation.court)
+        if day is None:
+            raise BookingError(f"The court is not open on {date_str}.")
+        if start >= end:
+            raise BookingError("Start time must be before end time.")
+        if start < day.open_time or end > day.close_time:
+            raise BookingError(
+                f"The court is only open from {format_hhmm(day.open_time)} to {format_hhmm(day.close_time)}."
+            )
+        if (start - day.open_time) % self.slot_minutes or (end - day.open_time) % self.slot_minutes:
+            raise BookingError(f"Bookings must line up with {self.slot_minutes}-minute slots.")
+        conflict = day.conflict(start, end)
+        if conflict is not None:
+            booked_at, booked_by = conflict
+            raise BookingError(
+                f"The time slot {format_hhmm(max(booked_at, start))} on {date_str} is already booked by {booked_by}."
+            )
@@ -0,0 +1,107 @@
+import contextlib
+import logging
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import TracerProvider
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets in seconds, from a fast friend reply up to a long LLM turn.
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+_NOOP = contextlib.nullcontext()
+
+
+class Telemetry:
+    """
+    OpenTelemetry spans and Prometheus histograms for the host's hot paths, off by default.
+
+    Metrics:
+    - host_span_duration_seconds{span}: time spent in each `span()` block (e.g. LLM turns)
+    - host_remote_call_duration_seconds{agent, outcome}: one sample per call to a friend
+
+    While disabled, `span()` returns a shared no-op context manager and
+    `observe_remote_call()` returns right away, so leaving the calls in costs
+    one flag check. Spans need `opentelemetry-api` and are only exported once an
+    OpenTelemetry SDK tracer provider is installed. It and `prometheus_client`
+    are optional and imported by `enable()`, not at import time.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._tracer = None  # Set by enable(); stays None without opentelemetry
+        self._registry = None
+        self._span_seconds = None
+        self._remote_call_seconds = None
+        # Label lookups are cached: .labels() takes a lock and builds a key every call
+        self._children: dict[tuple[int, tuple[str, ...]], object] = {}
+
+    def enable(self, tracer_provider: "TracerProvider | None" = None, metrics_port: int | None = None) -> None:
+        """
+        Starts recording. `tracer_provider` defaults to the global OpenTelemetry one;
+        with `metrics_port`, the metrics are also served on that port.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            logger.warning("opentelemetry-api is not installed: recording metrics only, no spans")
+        else:
+            self._tracer = trace.get_tracer(__name__, tracer_provider=tracer_provider)
+        try:
+            import prometheus_client  # Optional: without it only spans are recorded
+        except ImportError:
+            logger.warning("prometheus_client is not installed: recording spans only, no metrics")
+        else:
+            if self._registry is None:
+                self._registry = prometheus_client.CollectorRegistry()
+                self._span_seconds = prometheus_client.Histogram(
+                    "host_span_duration_seconds", "Time spent in each instrumented block",
+                    ["span"], registry=self._registry, buckets=DURATION_BUCKETS,
+                )
+                self._remote_call_seconds = prometheus_client.Histogram(
+                    "host_remote_call_duration_seconds", "Latency of calls to friend agents",
+                    ["agent", "outcome"], registry=self._registry, buckets=DURATION_BUCKETS,
+                )
+            if metrics_port is not None:
+                prometheus_client.start_http_server(metrics_port, registry=self._registry)
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NOOP
+        return self._timed_span(name, attributes)
+
+    @contextlib.contextmanager
+    def _timed_span(self, name: str, attributes: dict):
+        started = time.perf_counter()
+        try:
+            if self._tracer is None:
+                yield
+            else:
+                with self._tracer.start_as_current_span(name, attributes=attributes or None):
+                    yield
+        finally:
+            self._observe(self._span_seconds, (name,), time.perf_counter() - started)
+
+    def observe_remote_call(self, agent: str, outcome: str, seconds: float) -> None:
+        """Records one friend call; `outcome` is e.g. "success", "error" or "canceled"."""
+        if self.enabled:
+            self._observe(self._remote_call_seconds, (agent, outcome), seconds)
+
+    def _observe(self, histogram, labels: tuple[str, ...], seconds: float) -> None:
+        if histogram is None:
+            return
+        key = (id(histogram), labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = histogram.labels(*labels)
+        child.observe(seconds)
+
+
+# The process-wide instance every host module records into
+telemetry = Telemetry()
@@ -1,25 +1,34 @@
-from typing import Dict
-from datetime import datetime, date, timedelta
-COURT_SCHEDULE : Dict[str, Dict[str,str]] = {}
-# eg.
+import threading
+from typing import Dict, List
+from datetime import date, datetime
+from .schedule import CourtSchedule, BookingError, Reservation, format_hhmm, parse_hhmm
+
+# Free/busy index for the court(s); see schedule.py. Created by `get_schedule()` the
+# first time a tool needs it, so importing this module costs nothing.
+# Opening hours 08:00-21:00 in hourly slots, e.g. list_court_availabilities("2025-10-07") gives
 # {
-#     "2025-10-07": {
-#         "08:00": "unknown",
-#         "09:00": "Alice",
-#         "10:00": "unknown"
-#     }
+#     "available_slots": ["08:00", "10:00", ...],
+#     "booked_slots": {"09:00": "Alice"}
 # }
+_schedule:CourtSchedule|None = None
+_schedule_lock = threading.Lock()
+
+# Most candidate times `find_common_times` hands back to the model
+MAX_CANDIDATES = 5
 
-def generate_court_schedule():
-    global COURT_SCHEDULE
-    today = date.today()
-    possible_times = [f"{h:02}:00" for h in range(8,21)] #:02 is a padding to always show two digits like 08 09
-    for i in range(7):
-        current_date = today + timedelta(days=i)
-        date_str = current_date.strftime("%Y-%m-%d")
-        COURT_SCHEDULE[date_str] = {time:"unknown" for time in possible_times}
+def get_schedule()->CourtSchedule:
+    """The court schedule, created with the coming week open on first use."""
+    global _schedule
+    if _schedule is None:
+        with _schedule_lock:
+            if _schedule is None:
+                schedule = CourtSchedule(open_time="08:00", close_time="21:00", slot_minutes=60)
+                schedule.open_days(date.today(), 7)
+                _schedule = schedule
+    return _schedule
 
-generate_court_schedule()
+def generate_court_schedule(days:int = 7):
+    get_schedule().open_days(date.today(), days)
 
 def list_court_availabilities(date:str) -> Dict:
     try:
@@ -30,20 +39,15 @@ def list_court_availabilities(date:str) -> Dict:
             "message":"Invalid date format"
         }
 
-    daily_schedule = COURT_SCHEDULE.get(date)
-    if not daily_schedule:
+    schedule = get_schedule()
+    if schedule.day(date) is None:
         return {
             "status": "success",
             "message": f"The court is not open on {date}.",
             "schedule": {},
         }
 
-    available_slots = [
-        time for time, party in daily_schedule.items() if party == "unknown"
-    ]
-    booked_slots = {
-        time:party for time,party in daily_schedule.items() if party != "unknown"
-    }
+    available_slots, booked_slots = schedule.slots(date)
     return {
         "status": "success",
         "message": f"Schedule for {date}.",
@@ -51,22 +55,71 @@ def list_court_availabilities(date:str) -> Dict:
         "booked_slots": booked_slots,
     }
 
+def find_common_times(
+    availability:List[Dict[str,str]], start_date:str, end_date:str, duration_minutes:int
+)->Dict:
+    """
+    Finds the best times to play: when the court is free and the most friends can come.
+
+    Args:
+        availability: one item per free time range a friend reported, with "name",
+            "date" (YYYY-MM-DD), "start_time" and "end_time" (HH:MM).
+        start_date: first day to consider (YYYY-MM-DD).
+        end_date: last day to consider (YYYY-MM-DD).
+        duration_minutes: length of the game (60 if the user didn't say).
+    """
+    # numpy comes in with the ranking code, on the first call rather than at import
+    from .availability import rank_windows
+
+    ranges = {}
+    try:
+        for item in availability:
+            datetime.strptime(item["date"],"%Y-%m-%d")
+            ranges.setdefault(item["name"], []).append(
+                (item["date"], parse_hhmm(item["start_time"]), parse_hhmm(item["end_time"]))
+            )
+        windows = rank_windows(get_schedule(), start_date, end_date, ranges, duration_minutes, limit=MAX_CANDIDATES)
+    except KeyError:
+        return {
+            "status": "error",
+            "message": "Each availability item needs name, date (YYYY-MM-DD), start_time and end_time (HH:MM).",
+        }
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    if not windows:
+        return {
+            "status": "success",
+            "message": f"No court time between {start_date} and {end_date} works for any of the friends.",
+            "candidates": [],
+        }
+    return {
+        "status": "success",
+        "message": f"Best times between {start_date} and {end_date}, most friends first.",
+        "candidates": [
+            {
+                "date": window["date"],
+                "start_time": format_hhmm(window["start"]),
+                "end_time": format_hhmm(window["end"]),
+                "available": window["available"],
+                "missing": window["missing"],
+            }
+            for window in windows
+        ],
+    }
+
 def book_court(
     date:str, start_time:str, end_time:str, reservation_name:str
 )->Dict:
     try:
-        start_datetime = datetime.strptime(f"{date} {start_time}","%Y-%m-%d %H:%M")
-        end_datetime = datetime.strptime(f"{date} {end_time}","%Y-%m-%d %H:%M")
+        datetime.strptime(date,"%Y-%m-%d")
+        start = parse_hhmm(start_time)
+        end = parse_hhmm(end_time)
     except ValueError:
         return {
             "status": "error",
             "message": "Invalid date or time format. Please use YYYY-MM-DD and HH:MM.",
         }
-    if start_datetime > end_datetime:
-        return {"status": "error", "message": "Start time must be before end time."}
-
-    if date not in COURT_SCHEDULE:
-        return {"status": "error", "message": f"The court is not open on {date}."}
 
     if not reservation_name:
         return {
@@ -74,24 +127,55 @@ def book_court(
             "message": "Cannot book a court without a reservation name.",
         }
 
-    required_slots = []
-    current_time = start_datetime
-    while current_time < end_datetime:
-        required_slots.append(current_time.strftime("%H:%M"))
-        current_time += timedelta(hours=1)
+    try:
+        get_schedule().book(date, start, end, reservation_name)
+    except BookingError as e:
+        return {"status": "error", "message": str(e)}
+
+    return {
+        "status": "success",
+        "message": f"Success! The pickleball court has been booked for {reservation_name} from {start_time} to {end_time} on {date}.",
+    }
+
+
+def book_courts(bookings:List[Dict[str,str]])->Dict:
+    """
+    Books several time ranges at once, all or nothing.
 
-    daily_schedule = COURT_SCHEDULE.get(date, {})
-    for slot in required_slots:
-        if daily_schedule.get(slot, "booked") != "unknown":
-            party = daily_schedule.get(slot)
+    Args:
+        bookings: each item has "date" (YYYY-MM-DD), "start_time" and "end_time" (HH:MM)
+            and "reservation_name".
+    """
+    reservations = []
+    for booking in bookings:
+        try:
+            datetime.strptime(booking["date"],"%Y-%m-%d")
+            reservations.append(Reservation(
+                date=booking["date"],
+                start=parse_hhmm(booking["start_time"]),
+                end=parse_hhmm(booking["end_time"]),
+                party=booking["reservation_name"],
+            ))
+        except (KeyError, ValueError):
+            return {
+                "status": "error",
+                "message": "Each booking needs date (YYYY-MM-DD), start_time and end_time (HH:MM) and reservation_name.",
+            }
+        if not booking["reservation_name"]:
             return {
                 "status": "error",
-                "message": f"The time slot {slot} on {date} is already booked by {party}.",
+                "message": "Cannot book a court without a reservation name.",
             }
-    for slot in required_slots:
-        COURT_SCHEDULE[date][slot] = reservation_name
+    if not reservations:
+        return {"status": "error", "message": "No bookings given."}
 
+    try:
+        get_schedule().book_many(reservations)
+    except BookingError as e:
+        return {"status": "error", "message": f"Nothing was booked. {e}"}
+
+    booked = ", ".join(f"{b['date']} {b['start_time']}-{b['end_time']} for {b['reservation_name']}" for b in bookings)
     return {
         "status": "success",
-        "message": f"Success! The pickleball court has been booked for {reservation_name} from {start_time} to {end_time} on {date}.",
-    }
\ No newline at end of file
+        "message": f"Success! The pickleball court has been booked: {booked}.",
+    }
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    """Tuning knobs for the shared HTTP transport used to talk to friend agents."""
+
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    # Pool limits across all friend agents.
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    # How long an idle connection to a host is kept open for reuse.
+    keepalive_expiry: float = 60.0
+    # Multiplex requests over one connection per host. Needs the `h2` package;
+    # without it we quietly fall back to HTTP/1.1.
+    http2: bool = False
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPTransportManager:
+    """
+    Owns one pooled `httpx.AsyncClient` that every remote agent connection shares.
+
+    Connections to the same friend are kept alive between calls, so we pay the
+    TCP/TLS handshake once per host instead of once per client. Call `aclose()`
+    on shutdown to release the sockets.
+    """
+
+    def __init__(self, config: TransportConfig | None = None, client: httpx.AsyncClient | None = None) -> None:
+        # `client` replaces the pooled client, e.g. one mounting in-process ASGI apps for tests
+        self.config = config or TransportConfig()
+        self._client: httpx.AsyncClient | None = client
+        self._lock = asyncio.Lock()
+
+    def get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        config = self.config
+        http2 = config.http2 and _http2_available()
+        if config.http2 and not http2:
+            logger.warning("http2 requested but the 'h2' package is not installed, using HTTP/1.1")
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            http2=http2,
+        )
+
+    async def aclose(self) -> None:
+        async with self._lock:
+            if self._client is not None and not self._client.is_closed:
+                await self._client.aclose()
+            self._client = None
+
+
+_transport: HTTPTransportManager | None = None
+
+
+def configure_transport(
+    config: TransportConfig | None = None, client: httpx.AsyncClient | None = None
+) -> HTTPTransportManager:
+    """Replaces the process-wide transport. Call before any connection is created."""
+    global _transport
+    _transport = HTTPTransportManager(config, client)
+    return _transport
+
+
+def get_transport() -> HTTPTransportManager:
+    global _transport
+    if _transport is None:
+        _transport = HTTPTransportManager()
+    return _transport
+
+
+async def aclose_transport() -> None:
+    if _transport is not None:
+        await _transport.aclose()
@@ -0,0 +1,35 @@
+"""A deterministic stand-in for Gemini, so benchmarks measure our code and not the model."""
+
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai.types import Content, FunctionCall, Part
+
+
+class FakeLlm(BaseLlm):
+    """
+    Answers every request the same way, after an optional simulated model delay.
+
+    With `tool_call` set, a fresh user turn is answered with that function call and
+    the turn that carries its result is answered with `text`, like a one-tool agent.
+    """
+
+    model: str = "fake-llm"
+    text: str = "ok"
+    tool_call: tuple[str, dict] | None = None
+    latency: float = 0.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered = last is not None and any(part.function_response for part in last.parts or ())
+        if self.tool_call is not None and not answered:
+            name, args = self.tool_call
+            part = Part(function_call=FunctionCall(name=name, args=args))
+        else:
+            part = Part.from_text(text=self.text)
+        yield LlmResponse(content=Content(role="model", parts=[part]))
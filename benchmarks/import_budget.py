@@ -0,0 +1,123 @@
+"""
+Import-time budget for the agents' entry points, i.e. what a fresh replica pays
+before it can serve.
+
+Each module is imported in a new interpreter. The hard check is what it loads:
+none of the heavy packages listed for it may show up in sys.modules (google.adk
+alone takes seconds). Those load later, when an agent is built (`build()`,
+`root_agent`, `TellTimeAgent()`). Import failures fail too.
+
+Times are reported next to a rough budget but don't fail the run, since they
+depend on the machine and on what's in the OS file cache. `--strict-time` makes
+them fail as well, for a machine whose numbers you know.
+
+    python benchmarks/import_budget.py                 # exit code 1 if a heavy package loads
+    python benchmarks/import_budget.py --runs 5 --strict-time --scale 2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages the request path needs only once an agent is built or a server is started
+HEAVY = (
+    "google.adk", "google.genai", "a2a", "httpx", "uvicorn", "dotenv", "numpy", "fastapi",
+    "opentelemetry", "prometheus_client",
+)
+# What TellTime's server and task managers may not load: they need pydantic, Starlette
+# and httpx (push notifications) anyway, but not ADK, the a2a SDK, fastapi or telemetry
+TELLTIME_HEAVY = tuple(p for p in HEAVY if p not in ("httpx", "numpy"))
+
+
+@dataclass
+class Budget:
+    name: str
+    example: str  # directory put on sys.path, as when the example runs
+    code: str  # the import to time
+    max_ms: float  # rough, generous: a warning unless --strict-time
+    forbidden: tuple[str, ...] = HEAVY
+
+
+BUDGETS = [
+    Budget("host_agent_adk", "3-MultiFramework", "import host_agent_adk", 200),
+    Budget("host_agent_adk.tools", "3-MultiFramework", "import host_agent_adk.tools", 200),
+    Budget(
+        "2-SimpleExample/__main__.py", "2-SimpleExample",
+        "import runpy; runpy.run_path('__main__.py', run_name='greeting_main')", 200,
+    ),
+    Budget("agents.adk.agent", "1-TellTime", "import agents.adk.agent", 1500, TELLTIME_HEAVY),
+    Budget("agents.adk.task_manager", "1-TellTime", "import agents.adk.task_manager", 2000, TELLTIME_HEAVY),
+    Budget("server.server", "1-TellTime", "import server.server", 2000, TELLTIME_HEAVY),
+    # Importing this module means building the host: ADK, genai and the a2a SDK (which
+    # pull in fastapi, uvicorn, dotenv and opentelemetry themselves) are what it's made
+    # of. It still mustn't load the scheduling math or the metrics client
+    Budget(
+        "host_agent_adk.agent", "3-MultiFramework", "import host_agent_adk.agent", 20000,
+        ("numpy", "prometheus_client"),
+    ),
+]
+
+_CHILD = """
+import json, os, sys, time
+os.chdir({cwd!r})
+sys.path.insert(0, {cwd!r})
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+forbidden = {forbidden!r}
+loaded = sorted({{p for p in forbidden for m in sys.modules if m == p or m.startswith(p + ".")}})
+print(json.dumps({{"ms": elapsed * 1000, "loaded": loaded}}))
+"""
+
+
+def measure(budget: Budget, runs: int) -> dict:
+    """
+    Best-of-`runs` import time in fresh interpreters, plus any forbidden package it
+    loaded; "error" holds the last line of the traceback if the import failed.
+    """
+    cwd = os.path.join(ROOT, budget.example)
+    child = _CHILD.format(cwd=cwd, code=budget.code, forbidden=budget.forbidden)
+    samples, loaded = [], set()
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-W", "ignore", "-c", child], capture_output=True, text=True)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return {"ms": None, "loaded": [], "error": lines[-1] if lines else f"exit code {proc.returncode}"}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        loaded.update(result["loaded"])
+    return {"ms": min(samples), "loaded": sorted(loaded), "error": None}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per module (best one counts)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every time budget by this")
+    parser.add_argument("--strict-time", action="store_true", help="fail, not just warn, when over a time budget")
+    args = parser.parse_args()
+
+    failed = 0
+    for budget in BUDGETS:
+        result = measure(budget, args.runs)
+        limit = budget.max_ms * args.scale
+        problems, warnings = [], []
+        if result["error"]:
+            problems.append(f"import failed: {result['error']}")
+        elif result["ms"] > limit:
+            (problems if args.strict_time else warnings).append(f"over budget ({limit:.0f} ms)")
+        if result["loaded"]:
+            problems.append("loaded " + ", ".join(result["loaded"]))
+        failed += bool(problems)
+        took = "       -   " if result["ms"] is None else f"{result['ms']:8.1f} ms"
+        verdict = "FAIL: " + "; ".join(problems + warnings) if problems else "warn: " + "; ".join(warnings) if warnings else "ok"
+        print(f"{budget.name:>28}  {took}  {verdict}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
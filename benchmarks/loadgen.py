@@ -0,0 +1,96 @@
+"""Async load generator plus latency and allocation measurements."""
+
+import asyncio
+import gc
+import itertools
+import sys
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+Call = Callable[[int], Awaitable[None]]
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), round(q / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+async def run_load(call: Call, concurrency: int, requests: int, warmup: int = 0) -> dict:
+    """
+    Runs `requests` calls from `concurrency` workers (closed loop: each worker starts
+    its next call as soon as the last one finishes) and reports throughput and latency.
+    A call fails by raising; failures count as errors and are left out of the latencies.
+    """
+    for i in range(warmup):
+        await call(-1 - i)
+
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    async def worker() -> None:
+        while (i := next(counter)) < requests:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except Exception as e:
+                key = type(e).__name__
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    ms = 1000
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(errors.values()),
+        "error_types": errors,
+        "duration_s": round(duration, 4),
+        "rps": round(len(latencies) / duration, 1) if duration else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * ms, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * ms, 3),
+        "p95_ms": round(percentile(latencies, 95) * ms, 3),
+        "p99_ms": round(percentile(latencies, 99) * ms, 3),
+        "max_ms": round(latencies[-1] * ms, 3) if latencies else 0.0,
+    }
+
+
+async def measure_allocations(call: Call, requests: int) -> dict:
+    """
+    Runs `requests` calls one at a time and reports what they allocate.
+
+    - gc_gen0_collections: a gen-0 collection runs every `gc.get_threshold()[0]` net
+      container allocations, so this tracks allocation churn of Python objects
+    - retained_blocks_per_request: memory blocks still alive afterwards (leaks show up here)
+    - traced_peak_kib: peak traced memory during the run (tracemalloc, so run separately
+      from the latency pass)
+    """
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    collections_before = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    try:
+        for i in range(requests):
+            await call(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    collections = gc.get_stats()[0]["collections"] - collections_before
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks_before
+    return {
+        "requests": requests,
+        "gc_gen0_collections": collections,
+        "approx_container_allocs_per_request": round(collections * gc.get_threshold()[0] / requests, 1),
+        "retained_blocks_per_request": round(retained / requests, 2),
+        "traced_peak_kib": round(peak / 1024, 1),
+    }
@@ -0,0 +1,147 @@
+"""
+Load-test and latency benchmarks for the A2A servers in this repo.
+
+Every server runs in-process behind httpx's ASGITransport, with a deterministic fake
+LLM in place of Gemini, so numbers are repeatable and need no API key or network.
+
+    python benchmarks/run.py                                  # every scenario, default load
+    python benchmarks/run.py --scenarios telltime_send --concurrency 1,16,64 --requests 2000
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+    python benchmarks/run.py --telemetry                      # with spans and metrics on
+
+Results are written as JSON (default: benchmarks/results/<UTC timestamp>.json);
+`--compare` prints the change in RPS and latency against an earlier file.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadgen import measure_allocations, run_load  # noqa: E402
+from scenarios import ROOT, SCENARIOS, enable_telemetry  # noqa: E402
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_scenario(name: str, args: argparse.Namespace) -> dict:
+    results = {}
+    for concurrency in args.concurrency:
+        # Fresh servers per level, so one level's sessions and caches don't skew the next
+        scenario = await SCENARIOS[name](args.llm_latency_ms / 1000)
+        try:
+            result = await run_load(scenario.call, concurrency, args.requests, warmup=args.warmup)
+        finally:
+            await scenario.aclose()
+        results[str(concurrency)] = result
+        print(
+            f"{name:>14}  c={concurrency:<4} {result['rps']:>9.1f} req/s  p50 {result['p50_ms']:.2f} ms  "
+            f"p95 {result['p95_ms']:.2f} ms  p99 {result['p99_ms']:.2f} ms  errors {result['errors']}",
+            file=sys.__stdout__, flush=True,
+        )
+
+    if args.alloc_requests:
+        scenario = await SCENARIOS[name](args.llm_latency_ms / 1000)
+        try:
+            await run_load(scenario.call, 1, 0, warmup=args.warmup)
+            allocations = await measure_allocations(scenario.call, args.alloc_requests)
+        finally:
+            await scenario.aclose()
+        print(
+            f"{name:>14}  allocations: ~{allocations['approx_container_allocs_per_request']} objects/req, "
+            f"{allocations['retained_blocks_per_request']} blocks retained/req",
+            file=sys.__stdout__, flush=True,
+        )
+        return {"levels": results, "allocations": allocations}
+    return {"levels": results}
+
+
+def compare(current: dict, baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} ({baseline['meta'].get('commit')}):")
+    for name, scenario in current["results"].items():
+        old_levels = baseline["results"].get(name, {}).get("levels", {})
+        for level, result in scenario["levels"].items():
+            old = old_levels.get(level)
+            if not old:
+                continue
+            changes = []
+            for key in ("rps", "p50_ms", "p99_ms"):
+                if old[key]:
+                    changes.append(f"{key} {(result[key] - old[key]) / old[key] * 100:+.1f}%")
+            print(f"{name:>14}  c={level:<4} " + "  ".join(changes))
+
+
+async def main(args: argparse.Namespace) -> dict:
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "llm_latency_ms": args.llm_latency_ms,
+            "telemetry": args.telemetry,
+        },
+        "results": {},
+    }
+    if args.telemetry:
+        enable_telemetry()
+    # Keep anything the agents and libraries print out of the report and the timings' way
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name in args.scenarios:
+            report["results"][name] = await run_scenario(name, args)
+    return report
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated, default: all")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests before each level")
+    parser.add_argument("--alloc-requests", type=int, default=100, help="requests in the allocation pass (0 skips it)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated model time per LLM call")
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--telemetry", action="store_true", help="run with spans and Prometheus metrics enabled")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s) {unknown}; choose from {list(SCENARIOS)}")
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    if args.output is None:
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        args.output = os.path.join(ROOT, "benchmarks", "results", f"{stamp}.json")
+    return args
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    args = parse_args()
+    report = asyncio.run(main(args))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {args.output}")
+    if args.compare:
+        compare(report, args.compare)
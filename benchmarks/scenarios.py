@@ -0,0 +1,187 @@
+"""
+The servers under test, each wired up in-process: requests go through httpx's
+ASGITransport straight into the ASGI app, so there are no sockets and no real model.
+"""
+
+import importlib.util
+import os
+import sys
+import types
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The examples import their modules top-level (`models`, `agent_executor`, ...) and don't clash
+for example in ("1-TellTime", "2-SimpleExample", "3-MultiFramework"):
+    path = os.path.join(ROOT, example)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from fake_llm import FakeLlm  # noqa: E402
+
+FRIEND_NAMES = ["friend_1", "friend_2", "friend_3"]
+
+
+@dataclass
+class Scenario:
+    call: Callable[[int], Awaitable[None]]
+    aclose: Callable[[], Awaitable[None]]
+
+
+def enable_telemetry() -> None:
+    """Turns on spans and metrics in the TellTime server and the host agent."""
+    from host_agent_adk.telemetry import telemetry as host_telemetry
+    from server.telemetry import telemetry
+
+    telemetry.enable()
+    host_telemetry.enable()
+
+
+def _check_jsonrpc(response: httpx.Response) -> dict:
+    response.raise_for_status()
+    body = response.json()
+    if body.get("error"):
+        raise RuntimeError(body["error"].get("message", "JSON-RPC error"))
+    return body
+
+
+# -----------------------------------------------------------------------------
+# 1-TellTime: A2AServer + AgentTaskManager + TellTimeAgent
+# -----------------------------------------------------------------------------
+
+def _telltime_client(llm_latency: float) -> httpx.AsyncClient:
+    from agents.adk.agent import TellTimeAgent
+    from agents.adk.task_manager import AgentTaskManager
+    from models.agent import AgentCapabilities, AgentCard
+    from server.server import A2AServer
+
+    agent = TellTimeAgent(model=FakeLlm(text="2025-01-01 12:00:00", latency=llm_latency))
+    card = AgentCard(
+        name="TellTimeAgent", description="Tells the time", url="http://telltime", version="1.0.0",
+        capabilities=AgentCapabilities(), skils=[],
+    )
+    server = A2AServer(card, AgentTaskManager(agent))
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://telltime")
+
+
+def _telltime_send_body(task_id: str, session_id: str) -> dict:
+    return {
+        "jsonrpc": "2.0", "id": task_id, "method": "/tasks/send",
+        "params": {
+            "id": task_id, "session_id": session_id,
+            "message": {"role": "user", "parts": [{"type": "text", "text": "What time is it?"}]},
+        },
+    }
+
+
+async def telltime_send(llm_latency: float) -> Scenario:
+    client = _telltime_client(llm_latency)
+
+    async def call(i: int) -> None:
+        _check_jsonrpc(await client.post("/", json=_telltime_send_body(uuid.uuid4().hex, f"session-{i % 64}")))
+
+    return Scenario(call, client.aclose)
+
+
+async def telltime_get(llm_latency: float) -> Scenario:
+    client = _telltime_client(llm_latency)
+    _check_jsonrpc(await client.post("/", json=_telltime_send_body("bench-task", "bench-session")))
+    body = {"jsonrpc": "2.0", "id": 1, "method": "/tasks/get", "params": {"id": "bench-task", "history_length": 10}}
+
+    async def call(i: int) -> None:
+        _check_jsonrpc(await client.post("/", json=body))
+
+    return Scenario(call, client.aclose)
+
+
+# -----------------------------------------------------------------------------
+# 2-SimpleExample: A2AStarletteApplication + DefaultRequestHandler
+# -----------------------------------------------------------------------------
+
+def _greeting_app(name: str, url: str):
+    # 2-SimpleExample's entry point is a __main__.py, so load its build() by path
+    module = sys.modules.get("greeting_main")
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            "greeting_main", os.path.join(ROOT, "2-SimpleExample", "__main__.py")
+        )
+        module = sys.modules["greeting_main"] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module.build(url=url, name=name)
+
+
+async def simple_send(llm_latency: float) -> Scenario:
+    app = _greeting_app("greeting_agent", "http://greeting")
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://greeting")
+
+    async def call(i: int) -> None:
+        _check_jsonrpc(await client.post("/", json={
+            "jsonrpc": "2.0", "id": i, "method": "message/send",
+            "params": {"message": {
+                "role": "user", "messageId": uuid.uuid4().hex, "parts": [{"kind": "text", "text": "Hey"}],
+            }},
+        }))
+
+    return Scenario(call, client.aclose)
+
+
+# -----------------------------------------------------------------------------
+# 3-MultiFramework: the host agent fanning out to in-process friend agents
+# -----------------------------------------------------------------------------
+
+async def _host_agent(model: FakeLlm):
+    from host_agent_adk import agent, transport
+
+    mounts = {
+        f"http://{name}": httpx.ASGITransport(app=_greeting_app(name, f"http://{name}"))
+        for name in FRIEND_NAMES
+    }
+    transport.configure_transport(client=httpx.AsyncClient(mounts=mounts))
+    host = await agent.HostAgent.create([f"http://{name}" for name in FRIEND_NAMES], model=model)
+    return host
+
+
+async def host_fanout(llm_latency: float) -> Scenario:
+    """One `send_message_to_many` tool call: the host's send_message path without the LLM."""
+    host = await _host_agent(FakeLlm(latency=llm_latency))
+    tool_context = types.SimpleNamespace(state={})
+
+    async def call(i: int) -> None:
+        results = await host.send_message_to_many(FRIEND_NAMES, "Are you free on Saturday?", tool_context)
+        failed = [name for name, result in results.items() if result["status"] != "success"]
+        if failed:
+            raise RuntimeError(f"no answer from {failed}")
+
+    return Scenario(call, host.aclose)
+
+
+async def host_turn(llm_latency: float) -> Scenario:
+    """A whole host turn: fake LLM -> send_message_to_many -> friends -> fake LLM."""
+    model = FakeLlm(
+        text="Everyone is free on Saturday.",
+        tool_call=("send_message_to_many", {"agent_names": FRIEND_NAMES, "task": "Are you free on Saturday?"}),
+        latency=llm_latency,
+    )
+    host = await _host_agent(model)
+
+    async def call(i: int) -> None:
+        async for item in host.stream("Find a time for pickleball this weekend", session_id=uuid.uuid4().hex):
+            if item["is_task_complete"]:
+                if item.get("error"):
+                    raise RuntimeError(item["error"]["message"])
+                return
+        raise RuntimeError("turn ended without a final answer")
+
+    return Scenario(call, host.aclose)
+
+
+SCENARIOS = {
+    "telltime_send": telltime_send,
+    "telltime_get": telltime_get,
+    "simple_send": simple_send,
+    "host_fanout": host_fanout,
+    "host_turn": host_turn,
+}